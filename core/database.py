@@ -6,10 +6,25 @@ import sqlite3
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, AsyncIterator, Set
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
+# Ids per DELETE statement, below SQLite's bound-variable limit (999 on
+# older builds)
+_DELETE_BATCH_SIZE = 500
+
+# Bytes of the database file each connection may memory-map for reads
+_MMAP_SIZE = 256 * 1024 * 1024
+
+# Chunk columns with content cut short in SQL, so long chunk bodies are
+# never copied out of SQLite just to be truncated
+_CHUNK_PREVIEW_SELECT = (
+    'SELECT id, doc_id, scope, group_id, chunk_index, substr(content, 1, ?) AS content, '
+    'tags_json, entities_json, created_at FROM chunks'
+)
+
 
 class Database:
     """SQLite database handler with async support via thread pool"""
@@ -18,23 +33,82 @@ class Database:
         self.db_path = db_path
         self._executor = ThreadPoolExecutor(max_workers=2)  # Allow concurrent reads
         self._conn: Optional[sqlite3.Connection] = None
+        # Reads use one connection per worker thread; with WAL journaling they
+        # see the last commit without waiting for a running write
+        self._read_local = threading.local()
+        self._read_conns: List[sqlite3.Connection] = []
+        # Group ids that have documents or chunks, kept in step with every
+        # committed write so lookups for an unknown group can skip the query entirely
+        self._group_ids: Set[str] = set()
+        # Both workers share one connection, so a commit or rollback in one
+        # thread would end a transaction another thread has open
+        self._write_lock = threading.Lock()
     
     async def init(self):
         """Initialize database and create tables"""
-        await self._run_in_executor(self._init_db)
+        await self._run_write(self._init_db)
     
     def _get_conn(self) -> sqlite3.Connection:
         """Get or create database connection"""
         if self._conn is None:
-            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self._conn.row_factory = sqlite3.Row
+            self._conn = self._connect()
+            # WAL lets the read connections run alongside a write transaction;
+            # NORMAL sync is still durable across application crashes in WAL mode
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
         return self._conn
     
+    def _get_read_conn(self) -> sqlite3.Connection:
+        """Get or create the calling worker thread's read connection"""
+        conn = getattr(self._read_local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute('PRAGMA query_only=ON')
+            self._read_local.conn = conn
+            self._read_conns.append(conn)
+        return conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the settings shared by writer and readers"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=%d' % _MMAP_SIZE)
+        return conn
+    
+    @property
+    def mutation_counter(self) -> int:
+        """Monotonic count of rows changed through this connection"""
+        conn = self._conn
+        return conn.total_changes if conn is not None else 0
+    
     async def _run_in_executor(self, func, *args):
         """Run blocking database operations in thread pool"""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(self._executor, func, *args)
     
+    async def _run_write(self, func, *args):
+        """Run a writing database operation in the thread pool, one at a time"""
+        return await self._run_in_executor(self._locked, func, *args)
+    
+    def _locked(self, func, *args):
+        """Run func while holding the write lock
+        
+        Readers use their own connections and only see committed data, so the
+        writer is never left inside a transaction: whatever func leaves open is
+        committed, or rolled back if func raised.
+        """
+        with self._write_lock:
+            try:
+                result = func(*args)
+            except BaseException:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.commit()
+            return result
+    
     def _init_db(self):
         """Create database tables"""
         conn = self._get_conn()
@@ -123,27 +197,92 @@ class Database:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_group_id ON documents(group_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_status_mappings_status ON status_mappings(status_name)')
         
+        # Document/chunk counts per scope and group ('' for global), kept up
+        # to date by triggers so statistics never scan the big tables
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS kb_counts (
+                scope TEXT NOT NULL,
+                group_key TEXT NOT NULL,
+                doc_count INTEGER NOT NULL DEFAULT 0,
+                chunk_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (scope, group_key)
+            )
+        ''')
+        for table, column in (('documents', 'doc_count'), ('chunks', 'chunk_count')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO kb_counts (scope, group_key, {column})
+                    VALUES (NEW.scope, COALESCE(NEW.group_id, ''), 1)
+                    ON CONFLICT(scope, group_key) DO UPDATE SET {column} = {column} + 1;
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE kb_counts SET {column} = {column} - 1
+                    WHERE scope = OLD.scope AND group_key = COALESCE(OLD.group_id, '');
+                END
+            ''')
+        
+        # Recount once at startup, which also fills the table for databases
+        # created before it existed
+        cursor.execute('DELETE FROM kb_counts')
+        cursor.execute('''
+            INSERT INTO kb_counts (scope, group_key, doc_count)
+            SELECT scope, COALESCE(group_id, ''), COUNT(*) FROM documents GROUP BY 1, 2
+        ''')
+        cursor.execute('''
+            INSERT INTO kb_counts (scope, group_key, chunk_count)
+            SELECT scope, COALESCE(group_id, ''), COUNT(*) FROM chunks WHERE true GROUP BY 1, 2
+            ON CONFLICT(scope, group_key) DO UPDATE SET chunk_count = excluded.chunk_count
+        ''')
+        
         conn.commit()
+        self._load_group_ids(cursor)
+    
+    def _load_group_ids(self, cursor: sqlite3.Cursor):
+        """Re-read the set of groups that still have data (from kb_counts)"""
+        cursor.execute(
+            "SELECT DISTINCT group_key FROM kb_counts "
+            "WHERE group_key != '' AND (doc_count > 0 OR chunk_count > 0)"
+        )
+        self._group_ids = {row['group_key'] for row in cursor.fetchall()}
+    
+    def has_group_data(self, group_id: str) -> bool:
+        """Whether any document or chunk belongs to group_id (no query needed)"""
+        return group_id in self._group_ids
+    
+    def _add_group_id(self, group_id: Optional[str]):
+        """Record a group that now has data; call only once the insert has committed"""
+        if group_id:
+            self._group_ids.add(group_id)
     
     # ============ Document Operations ============
     
     async def add_document(self, name: str, raw_text: str, scope: str = 'global', 
                           group_id: Optional[str] = None) -> int:
         """Add a new document and return its ID"""
-        return await self._run_in_executor(
+        return await self._run_write(
             self._add_document, name, raw_text, scope, group_id
         )
     
     def _add_document(self, name: str, raw_text: str, scope: str, 
                      group_id: Optional[str]) -> int:
         conn = self._get_conn()
-        cursor = conn.cursor()
+        doc_id = self._insert_document(conn.cursor(), name, raw_text, scope, group_id)
+        conn.commit()
+        self._add_group_id(group_id)
+        return doc_id
+    
+    def _insert_document(self, cursor: sqlite3.Cursor, name: str, raw_text: str,
+                         scope: str, group_id: Optional[str]) -> int:
+        """Insert a document row and return its ID (caller commits)"""
         now = datetime.now().isoformat()
         cursor.execute('''
             INSERT INTO documents (scope, group_id, name, created_at, raw_text, raw_text_len)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (scope, group_id, name, now, raw_text, len(raw_text)))
-        conn.commit()
         return cursor.lastrowid
     
     async def get_documents(self, scope: Optional[str] = None, 
@@ -152,7 +291,7 @@ class Database:
         return await self._run_in_executor(self._get_documents, scope, group_id)
     
     def _get_documents(self, scope: Optional[str], group_id: Optional[str]) -> List[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         
         query = 'SELECT * FROM documents WHERE 1=1'
@@ -174,7 +313,7 @@ class Database:
         return await self._run_in_executor(self._get_document_by_id, doc_id)
     
     def _get_document_by_id(self, doc_id: int) -> Optional[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM documents WHERE id = ?', (doc_id,))
         row = cursor.fetchone()
@@ -182,19 +321,35 @@ class Database:
     
     async def delete_document(self, doc_id: int):
         """Delete a document and its chunks"""
-        await self._run_in_executor(self._delete_document, doc_id)
+        await self._run_write(self._delete_documents, [doc_id])
     
-    def _delete_document(self, doc_id: int):
+    async def delete_documents(self, doc_ids: List[int]) -> int:
+        """Delete several documents and their chunks in one transaction
+        
+        Returns:
+            Number of documents deleted
+        """
+        return await self._run_write(self._delete_documents, list(doc_ids))
+    
+    def _delete_documents(self, doc_ids: List[int]) -> int:
         conn = self._get_conn()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM chunks WHERE doc_id = ?', (doc_id,))
-        cursor.execute('DELETE FROM documents WHERE id = ?', (doc_id,))
-        conn.commit()
+        deleted = 0
+        with conn:
+            for start in range(0, len(doc_ids), _DELETE_BATCH_SIZE):
+                batch = doc_ids[start:start + _DELETE_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                conn.execute(f'DELETE FROM chunks WHERE doc_id IN ({placeholders})', batch)
+                deleted += conn.execute(
+                    f'DELETE FROM documents WHERE id IN ({placeholders})', batch
+                ).rowcount
+        if deleted:
+            self._load_group_ids(conn.cursor())
+        return deleted
     
     async def clear_documents(self, scope: Optional[str] = None, 
                              group_id: Optional[str] = None):
         """Clear documents by scope/group"""
-        await self._run_in_executor(self._clear_documents, scope, group_id)
+        await self._run_write(self._clear_documents, scope, group_id)
     
     def _clear_documents(self, scope: Optional[str], group_id: Optional[str]):
         conn = self._get_conn()
@@ -222,26 +377,62 @@ class Database:
             cursor.execute(f'DELETE FROM documents WHERE {where_clause}', params)
         
         conn.commit()
+        if doc_ids:
+            self._load_group_ids(cursor)
+    
+    async def import_document(self, name: str, raw_text: str, chunks: List[Dict],
+                              scope: str = 'global', group_id: Optional[str] = None,
+                              last_import_at: Optional[str] = None) -> int:
+        """Store a document and all of its chunks in one transaction
+        
+        With last_import_at, the group's import time is recorded in that same
+        transaction.
+        """
+        return await self._run_write(
+            self._import_document, name, raw_text, chunks, scope, group_id, last_import_at
+        )
+    
+    def _import_document(self, name: str, raw_text: str, chunks: List[Dict],
+                         scope: str, group_id: Optional[str],
+                         last_import_at: Optional[str] = None) -> int:
+        conn = self._get_conn()
+        with conn:
+            cursor = conn.cursor()
+            doc_id = self._insert_document(cursor, name, raw_text, scope, group_id)
+            self._insert_chunks(cursor, doc_id, chunks, scope, group_id)
+            if last_import_at is not None:
+                cursor.execute('''
+                    INSERT INTO group_settings (group_id, default_mode, last_import_at, created_at)
+                    VALUES (?, 'simple', ?, ?)
+                    ON CONFLICT(group_id) DO UPDATE SET last_import_at = excluded.last_import_at
+                ''', (group_id, last_import_at, datetime.now().isoformat()))
+        self._add_group_id(group_id)
+        return doc_id
     
     # ============ Chunk Operations ============
     
     async def add_chunks(self, doc_id: int, chunks: List[Dict], scope: str = 'global',
                         group_id: Optional[str] = None):
         """Add multiple chunks for a document"""
-        await self._run_in_executor(self._add_chunks, doc_id, chunks, scope, group_id)
+        await self._run_write(self._add_chunks, doc_id, chunks, scope, group_id)
     
     def _add_chunks(self, doc_id: int, chunks: List[Dict], scope: str,
                    group_id: Optional[str]):
         conn = self._get_conn()
-        cursor = conn.cursor()
+        self._insert_chunks(conn.cursor(), doc_id, chunks, scope, group_id)
+        conn.commit()
+        self._add_group_id(group_id)
+    
+    def _insert_chunks(self, cursor: sqlite3.Cursor, doc_id: int, chunks: List[Dict],
+                       scope: str, group_id: Optional[str]):
+        """Insert all chunks with a single executemany (caller commits)"""
         now = datetime.now().isoformat()
-        
-        for i, chunk in enumerate(chunks):
-            cursor.execute('''
-                INSERT INTO chunks (doc_id, scope, group_id, chunk_index, content, 
-                                   tags_json, entities_json, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        cursor.executemany('''
+            INSERT INTO chunks (doc_id, scope, group_id, chunk_index, content, 
+                               tags_json, entities_json, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
                 doc_id,
                 scope,
                 group_id,
@@ -250,24 +441,16 @@ class Database:
                 json.dumps(chunk.get('tags', []), ensure_ascii=False),
                 json.dumps(chunk.get('entities', {}), ensure_ascii=False),
                 now
-            ))
-        
-        conn.commit()
-    
-    async def get_chunks(self, scope: Optional[str] = None, 
-                        group_id: Optional[str] = None,
-                        doc_id: Optional[int] = None) -> List[Dict]:
-        """Get chunks with optional filters"""
-        return await self._run_in_executor(self._get_chunks, scope, group_id, doc_id)
-    
-    def _get_chunks(self, scope: Optional[str], group_id: Optional[str],
-                   doc_id: Optional[int]) -> List[Dict]:
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM chunks WHERE 1=1'
+            )
+            for i, chunk in enumerate(chunks)
+        ])
+    
+    @staticmethod
+    def _chunk_filter(scope: Optional[str], group_id: Optional[str],
+                      doc_id: Optional[int]) -> Tuple[str, List[Any]]:
+        """WHERE clause and parameters shared by chunk listing and counting"""
+        query = ' WHERE 1=1'
         params = []
-        
         if scope:
             query += ' AND scope = ?'
             params.append(scope)
@@ -277,25 +460,90 @@ class Database:
         if doc_id:
             query += ' AND doc_id = ?'
             params.append(doc_id)
+        return query, params
+    
+    async def get_chunks(self, scope: Optional[str] = None, 
+                        group_id: Optional[str] = None,
+                        doc_id: Optional[int] = None,
+                        limit: Optional[int] = None,
+                        offset: int = 0,
+                        content_preview_len: Optional[int] = None) -> List[Dict]:
+        """Get chunks with optional filters, paged by limit and offset
+        
+        With content_preview_len, content is cut to that many characters plus
+        one in SQL, so callers can still tell a preview was truncated.
+        """
+        return await self._run_in_executor(
+            self._get_chunks, scope, group_id, doc_id, limit, offset, content_preview_len
+        )
+    
+    def _get_chunks(self, scope: Optional[str], group_id: Optional[str],
+                   doc_id: Optional[int], limit: Optional[int] = None,
+                   offset: int = 0, content_preview_len: Optional[int] = None) -> List[Dict]:
+        conn = self._get_read_conn()
+        cursor = conn.cursor()
         
-        query += ' ORDER BY doc_id, chunk_index'
+        where, params = self._chunk_filter(scope, group_id, doc_id)
+        if content_preview_len is None:
+            query = 'SELECT * FROM chunks'
+        else:
+            query = _CHUNK_PREVIEW_SELECT
+            params.insert(0, content_preview_len + 1)
+        query += where + ' ORDER BY doc_id, chunk_index'
+        if limit is not None or offset:
+            # SQLite needs a LIMIT before OFFSET; -1 means no limit
+            query += ' LIMIT ? OFFSET ?'
+            params.extend((-1 if limit is None else limit, offset))
         cursor.execute(query, params)
         
-        results = []
-        for row in cursor.fetchall():
-            chunk = dict(row)
-            chunk['tags'] = json.loads(chunk['tags_json'])
-            chunk['entities'] = json.loads(chunk['entities_json'])
-            results.append(chunk)
+        return [self._chunk_from_row(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _chunk_from_row(row: sqlite3.Row) -> Dict:
+        """Convert a chunks row to a dict with its JSON fields parsed"""
+        chunk = dict(row)
+        chunk['tags'] = json.loads(chunk['tags_json'])
+        chunk['entities'] = json.loads(chunk['entities_json'])
+        return chunk
+    
+    async def iter_chunks(self, scope: Optional[str] = None,
+                          group_id: Optional[str] = None,
+                          doc_id: Optional[int] = None,
+                          batch_size: int = 200) -> AsyncIterator[Dict]:
+        """Yield chunks with optional filters, in id order, batch by batch
+        
+        Each batch is a separate query resuming after the last id seen, so no
+        cursor is held open while the caller consumes the rows.
+        """
+        after_id = 0
+        while True:
+            batch = await self._run_in_executor(
+                self._get_chunk_batch, scope, group_id, doc_id, after_id, batch_size
+            )
+            for chunk in batch:
+                yield chunk
+            if len(batch) < batch_size:
+                return
+            after_id = batch[-1]['id']
+    
+    def _get_chunk_batch(self, scope: Optional[str], group_id: Optional[str],
+                         doc_id: Optional[int], after_id: int, limit: int) -> List[Dict]:
+        conn = self._get_read_conn()
+        cursor = conn.cursor()
         
-        return results
+        where, params = self._chunk_filter(scope, group_id, doc_id)
+        cursor.execute(
+            'SELECT * FROM chunks' + where + ' AND id > ? ORDER BY id LIMIT ?',
+            params + [after_id, limit]
+        )
+        return [self._chunk_from_row(row) for row in cursor.fetchall()]
     
     async def get_all_chunks_for_search(self, group_id: Optional[str] = None) -> List[Dict]:
         """Get all searchable chunks (global + group-specific)"""
         return await self._run_in_executor(self._get_all_chunks_for_search, group_id)
     
     def _get_all_chunks_for_search(self, group_id: Optional[str]) -> List[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         
         # Get global chunks
@@ -319,25 +567,18 @@ class Database:
         return chunks
     
     async def get_chunk_count(self, scope: Optional[str] = None,
-                             group_id: Optional[str] = None) -> int:
+                             group_id: Optional[str] = None,
+                             doc_id: Optional[int] = None) -> int:
         """Get total chunk count"""
-        return await self._run_in_executor(self._get_chunk_count, scope, group_id)
+        return await self._run_in_executor(self._get_chunk_count, scope, group_id, doc_id)
     
-    def _get_chunk_count(self, scope: Optional[str], group_id: Optional[str]) -> int:
-        conn = self._get_conn()
+    def _get_chunk_count(self, scope: Optional[str], group_id: Optional[str],
+                         doc_id: Optional[int] = None) -> int:
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         
-        query = 'SELECT COUNT(*) as cnt FROM chunks WHERE 1=1'
-        params = []
-        
-        if scope:
-            query += ' AND scope = ?'
-            params.append(scope)
-        if group_id:
-            query += ' AND group_id = ?'
-            params.append(group_id)
-        
-        cursor.execute(query, params)
+        where, params = self._chunk_filter(scope, group_id, doc_id)
+        cursor.execute('SELECT COUNT(*) as cnt FROM chunks' + where, params)
         return cursor.fetchone()['cnt']
     
     # ============ Alias Operations ============
@@ -345,7 +586,7 @@ class Database:
     async def add_alias(self, alias: str, canonical: str, 
                        alias_type: str = 'other') -> bool:
         """Add or update an alias"""
-        return await self._run_in_executor(self._add_alias, alias, canonical, alias_type)
+        return await self._run_write(self._add_alias, alias, canonical, alias_type)
     
     def _add_alias(self, alias: str, canonical: str, alias_type: str) -> bool:
         conn = self._get_conn()
@@ -364,7 +605,7 @@ class Database:
         return await self._run_in_executor(self._get_aliases)
     
     def _get_aliases(self) -> List[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM aliases ORDER BY alias')
         return [dict(row) for row in cursor.fetchall()]
@@ -374,14 +615,14 @@ class Database:
         return await self._run_in_executor(self._get_alias_map)
     
     def _get_alias_map(self) -> Dict[str, str]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT alias, canonical FROM aliases')
         return {row['alias']: row['canonical'] for row in cursor.fetchall()}
     
     async def delete_alias(self, alias: str) -> bool:
         """Delete an alias"""
-        return await self._run_in_executor(self._delete_alias, alias)
+        return await self._run_write(self._delete_alias, alias)
     
     def _delete_alias(self, alias: str) -> bool:
         conn = self._get_conn()
@@ -394,7 +635,7 @@ class Database:
     
     async def get_group_settings(self, group_id: str) -> Dict:
         """Get or create group settings"""
-        return await self._run_in_executor(self._get_group_settings, group_id)
+        return await self._run_write(self._get_group_settings, group_id)
     
     def _get_group_settings(self, group_id: str) -> Dict:
         conn = self._get_conn()
@@ -422,7 +663,7 @@ class Database:
     
     async def update_group_settings(self, group_id: str, **kwargs):
         """Update group settings"""
-        await self._run_in_executor(self._update_group_settings, group_id, kwargs)
+        await self._run_write(self._update_group_settings, group_id, kwargs)
     
     def _update_group_settings(self, group_id: str, updates: Dict):
         conn = self._get_conn()
@@ -452,7 +693,7 @@ class Database:
         return await self._run_in_executor(self._get_stats, group_id)
     
     def _get_stats(self, group_id: Optional[str]) -> Dict:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         
         stats = {
@@ -461,24 +702,17 @@ class Database:
             'total': {'doc_count': 0, 'chunk_count': 0}
         }
         
-        # Global stats
-        cursor.execute("SELECT COUNT(*) as cnt FROM documents WHERE scope = 'global'")
-        stats['global']['doc_count'] = cursor.fetchone()['cnt']
-        cursor.execute("SELECT COUNT(*) as cnt FROM chunks WHERE scope = 'global'")
-        stats['global']['chunk_count'] = cursor.fetchone()['cnt']
-        
-        # Group stats (if group_id provided)
-        if group_id:
-            cursor.execute(
-                "SELECT COUNT(*) as cnt FROM documents WHERE scope = 'group' AND group_id = ?",
-                (group_id,)
-            )
-            stats['group']['doc_count'] = cursor.fetchone()['cnt']
-            cursor.execute(
-                "SELECT COUNT(*) as cnt FROM chunks WHERE scope = 'group' AND group_id = ?",
-                (group_id,)
-            )
-            stats['group']['chunk_count'] = cursor.fetchone()['cnt']
+        # Global stats, plus group stats if group_id provided
+        cursor.execute(
+            "SELECT scope, doc_count, chunk_count FROM kb_counts "
+            "WHERE (scope = 'global' AND group_key = '') OR (scope = 'group' AND group_key = ?)",
+            (group_id or '',)
+        )
+        for row in cursor.fetchall():
+            if row['scope'] == 'group' and not group_id:
+                continue
+            stats[row['scope']]['doc_count'] = row['doc_count']
+            stats[row['scope']]['chunk_count'] = row['chunk_count']
         
         stats['total']['doc_count'] = stats['global']['doc_count'] + stats['group']['doc_count']
         stats['total']['chunk_count'] = stats['global']['chunk_count'] + stats['group']['chunk_count']
@@ -490,7 +724,7 @@ class Database:
         return await self._run_in_executor(self._get_all_group_ids)
     
     def _get_all_group_ids(self) -> List[str]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT DISTINCT group_id FROM documents WHERE group_id IS NOT NULL"
@@ -502,6 +736,10 @@ class Database:
         if self._conn:
             self._conn.close()
             self._conn = None
+        for conn in self._read_conns:
+            conn.close()
+        self._read_conns = []
+        self._read_local = threading.local()
         self._executor.shutdown(wait=True, cancel_futures=False)
     
     # ============ Custom Template Operations ============
@@ -511,7 +749,7 @@ class Database:
         return await self._run_in_executor(self._get_templates)
     
     def _get_templates(self) -> List[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM custom_templates ORDER BY is_default DESC, name ASC')
         return [dict(row) for row in cursor.fetchall()]
@@ -521,7 +759,7 @@ class Database:
         return await self._run_in_executor(self._get_template_by_name, name)
     
     def _get_template_by_name(self, name: str) -> Optional[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM custom_templates WHERE name = ?', (name,))
         row = cursor.fetchone()
@@ -530,7 +768,7 @@ class Database:
     async def save_template(self, name: str, content: str, 
                            description: str = '', is_default: bool = False) -> int:
         """Save or update a custom template"""
-        return await self._run_in_executor(
+        return await self._run_write(
             self._save_template, name, content, description, is_default
         )
     
@@ -544,24 +782,23 @@ class Database:
         cursor.execute('SELECT id FROM custom_templates WHERE name = ?', (name,))
         existing = cursor.fetchone()
         
-        if existing:
-            cursor.execute('''
-                UPDATE custom_templates 
-                SET content = ?, description = ?, is_default = ?, updated_at = ?
-                WHERE name = ?
-            ''', (content, description, 1 if is_default else 0, now, name))
-            return existing['id']
-        else:
+        with conn:
+            if existing:
+                cursor.execute('''
+                    UPDATE custom_templates 
+                    SET content = ?, description = ?, is_default = ?, updated_at = ?
+                    WHERE name = ?
+                ''', (content, description, 1 if is_default else 0, now, name))
+                return existing['id']
             cursor.execute('''
                 INSERT INTO custom_templates (name, content, description, is_default, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (name, content, description, 1 if is_default else 0, now, now))
-            conn.commit()
             return cursor.lastrowid
     
     async def delete_template(self, name: str) -> bool:
         """Delete a custom template"""
-        return await self._run_in_executor(self._delete_template, name)
+        return await self._run_write(self._delete_template, name)
     
     def _delete_template(self, name: str) -> bool:
         conn = self._get_conn()
@@ -577,7 +814,7 @@ class Database:
         return await self._run_in_executor(self._get_status_mappings, status_name)
     
     def _get_status_mappings(self, status_name: Optional[str]) -> List[Dict]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         
         if status_name:
@@ -593,7 +830,7 @@ class Database:
     async def add_status_mapping(self, status_name: str, subcategory: str,
                                  display_name: str, description: str = '') -> int:
         """Add or update a status mapping"""
-        return await self._run_in_executor(
+        return await self._run_write(
             self._add_status_mapping, status_name, subcategory, display_name, description
         )
     
@@ -613,7 +850,7 @@ class Database:
     
     async def delete_status_mapping(self, mapping_id: int) -> bool:
         """Delete a status mapping by ID"""
-        return await self._run_in_executor(self._delete_status_mapping, mapping_id)
+        return await self._run_write(self._delete_status_mapping, mapping_id)
     
     def _delete_status_mapping(self, mapping_id: int) -> bool:
         conn = self._get_conn()
@@ -627,7 +864,7 @@ class Database:
         return await self._run_in_executor(self._get_status_mapping_dict)
     
     def _get_status_mapping_dict(self) -> Dict[str, List[Dict]]:
-        conn = self._get_conn()
+        conn = self._get_read_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM status_mappings ORDER BY status_name, subcategory')
         
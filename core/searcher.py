@@ -4,7 +4,9 @@ Implements BM25-based search with tag weighting
 Supports optional embedding and reranking models from AstrBot
 """
 import re
+import sys
 import math
+import threading
 from typing import List, Dict, Tuple, Optional, Set, Any, TYPE_CHECKING
 from collections import Counter
 
@@ -46,10 +48,18 @@ class Searcher:
             rerank_provider: Optional RerankProvider from AstrBot for result reranking
         """
         self.chunks = chunks or []
-        self.alias_map = alias_map or {}
+        self.alias_map: Dict[str, str] = {}
+        # Compiled alias patterns, rebuilt on first use after the map changes
+        self._alias_patterns: Optional[List[Tuple[re.Pattern, str]]] = None
         self.embedding_provider = embedding_provider
         self.rerank_provider = rerank_provider
         
+        # Lexical searches may run in a worker thread (WebUI); index and
+        # alias updates hold this lock so a search never sees them half-applied
+        self._lock = threading.RLock()
+        if alias_map:
+            self.update_aliases(alias_map)
+        
         # BM25 index structures
         self.doc_freq: Dict[str, int] = {}  # Document frequency for each term
         self.doc_lens: List[int] = []  # Length of each document
@@ -75,15 +85,32 @@ class Searcher:
     
     def update_chunks(self, chunks: List[Dict]):
         """Update chunks and rebuild index"""
-        self.chunks = chunks
-        self._build_index()
-        # Reset embedding cache when chunks are updated
-        self._embeddings_computed = False
-        self.chunk_embeddings = []
+        with self._lock:
+            self.chunks = chunks
+            self._build_index()
+            # Reset embedding cache when chunks are updated
+            self._embeddings_computed = False
+            self.chunk_embeddings = []
     
     def update_aliases(self, alias_map: Dict[str, str]):
         """Update alias mapping"""
-        self.alias_map = alias_map
+        # Keys are stored lowercased (as in the database) and interned
+        alias_map = {sys.intern(alias.lower()): canonical for alias, canonical in alias_map.items()}
+        with self._lock:
+            self.alias_map = alias_map
+            self._alias_patterns = None
+    
+    def add_alias(self, alias: str, canonical: str):
+        """Add or replace a single alias without reloading the whole mapping"""
+        with self._lock:
+            self.alias_map[sys.intern(alias.lower())] = canonical
+            self._alias_patterns = None
+    
+    def remove_alias(self, alias: str):
+        """Remove a single alias if present"""
+        with self._lock:
+            self.alias_map.pop(alias.lower(), None)
+            self._alias_patterns = None
     
     def _tokenize(self, text: str) -> List[str]:
         """
@@ -140,11 +167,17 @@ class Searcher:
     
     def _apply_aliases(self, query: str) -> str:
         """Apply alias substitutions to query"""
-        result = query.lower()
-        
-        for alias, canonical in self.alias_map.items():
+        patterns = self._alias_patterns
+        if patterns is None:
             # Case-insensitive replacement
-            pattern = re.compile(re.escape(alias), re.IGNORECASE)
+            patterns = [
+                (re.compile(re.escape(alias), re.IGNORECASE), canonical)
+                for alias, canonical in self.alias_map.items()
+            ]
+            self._alias_patterns = patterns
+        
+        result = query.lower()
+        for pattern, canonical in patterns:
             result = pattern.sub(canonical, result)
         
         return result
@@ -238,57 +271,58 @@ class Searcher:
         Returns:
             List of chunk dicts with 'score' and 'score_breakdown' added
         """
-        if not self.chunks:
-            return []
-        
-        # Apply alias substitutions
-        processed_query = self._apply_aliases(query)
-        
-        # Tokenize query
-        query_tokens = self._tokenize(processed_query)
-        
-        if not query_tokens:
-            return []
-        
-        # Extract tags from query
-        query_tags = self._extract_query_tags(processed_query)
-        
-        # Score all chunks
-        scored_chunks = []
-        
-        for idx, chunk in enumerate(self.chunks):
-            # Base BM25 score
-            bm25_score = self._calculate_bm25_score(query_tokens, idx)
+        with self._lock:
+            if not self.chunks:
+                return []
             
-            # Tag boost
-            tag_score = 0.0
-            chunk_tags = set(chunk.get('tags', []))
-            matching_tags = query_tags & chunk_tags
-            if matching_tags:
-                tag_score = len(matching_tags) * self.TAG_BOOST
+            # Apply alias substitutions
+            processed_query = self._apply_aliases(query)
             
-            # Group boost
-            group_score = 0.0
-            if group_id and chunk.get('scope') == 'group' and chunk.get('group_id') == group_id:
-                group_score = self.GROUP_BOOST
+            # Tokenize query
+            query_tokens = self._tokenize(processed_query)
             
-            total_score = bm25_score + tag_score + group_score
+            if not query_tokens:
+                return []
             
-            if total_score > 0:
-                result = dict(chunk)
-                result['score'] = total_score
-                result['score_breakdown'] = {
-                    'bm25': bm25_score,
-                    'tag_boost': tag_score,
-                    'group_boost': group_score,
-                    'matching_tags': list(matching_tags)
-                }
-                scored_chunks.append(result)
-        
-        # Sort by score and return top_k
-        scored_chunks.sort(key=lambda x: x['score'], reverse=True)
-        
-        return scored_chunks[:top_k]
+            # Extract tags from query
+            query_tags = self._extract_query_tags(processed_query)
+            
+            # Score all chunks
+            scored_chunks = []
+            
+            for idx, chunk in enumerate(self.chunks):
+                # Base BM25 score
+                bm25_score = self._calculate_bm25_score(query_tokens, idx)
+                
+                # Tag boost
+                tag_score = 0.0
+                chunk_tags = set(chunk.get('tags', []))
+                matching_tags = query_tags & chunk_tags
+                if matching_tags:
+                    tag_score = len(matching_tags) * self.TAG_BOOST
+                
+                # Group boost
+                group_score = 0.0
+                if group_id and chunk.get('scope') == 'group' and chunk.get('group_id') == group_id:
+                    group_score = self.GROUP_BOOST
+                
+                total_score = bm25_score + tag_score + group_score
+                
+                if total_score > 0:
+                    result = dict(chunk)
+                    result['score'] = total_score
+                    result['score_breakdown'] = {
+                        'bm25': bm25_score,
+                        'tag_boost': tag_score,
+                        'group_boost': group_score,
+                        'matching_tags': list(matching_tags)
+                    }
+                    scored_chunks.append(result)
+            
+            # Sort by score and return top_k
+            scored_chunks.sort(key=lambda x: x['score'], reverse=True)
+            
+            return scored_chunks[:top_k]
     
     def search_with_debug(self, query: str, top_k: int = 6,
                          group_id: Optional[str] = None) -> Dict:
@@ -298,33 +332,34 @@ class Searcher:
         Returns:
             Dict with 'results', 'query_info', 'stats' keys
         """
-        processed_query = self._apply_aliases(query)
-        query_tokens = self._tokenize(processed_query)
-        query_tags = self._extract_query_tags(processed_query)
-        
-        results = self.search(query, top_k, group_id)
-        
-        return {
-            'results': results,
-            'query_info': {
-                'original_query': query,
-                'processed_query': processed_query,
-                'tokens': query_tokens,
-                'extracted_tags': list(query_tags),
-                'alias_substitutions': [
-                    f"{k} -> {v}" for k, v in self.alias_map.items()
-                    if k.lower() in query.lower()
-                ]
-            },
-            'stats': {
-                'total_chunks': len(self.chunks),
-                'results_count': len(results),
-                'avg_doc_len': self.avg_doc_len,
-                'unique_terms': len(self.doc_freq),
-                'embedding_enabled': self.embedding_provider is not None,
-                'rerank_enabled': self.rerank_provider is not None
+        with self._lock:
+            processed_query = self._apply_aliases(query)
+            query_tokens = self._tokenize(processed_query)
+            query_tags = self._extract_query_tags(processed_query)
+            
+            results = self.search(query, top_k, group_id)
+            
+            return {
+                'results': results,
+                'query_info': {
+                    'original_query': query,
+                    'processed_query': processed_query,
+                    'tokens': query_tokens,
+                    'extracted_tags': list(query_tags),
+                    'alias_substitutions': [
+                        f"{k} -> {v}" for k, v in self.alias_map.items()
+                        if k.lower() in query.lower()
+                    ]
+                },
+                'stats': {
+                    'total_chunks': len(self.chunks),
+                    'results_count': len(results),
+                    'avg_doc_len': self.avg_doc_len,
+                    'unique_terms': len(self.doc_freq),
+                    'embedding_enabled': self.embedding_provider is not None,
+                    'rerank_enabled': self.rerank_provider is not None
+                }
             }
-        }
     
     async def search_async(self, query: str, top_k: int = 6,
                           group_id: Optional[str] = None) -> List[Dict]:
@@ -534,6 +569,12 @@ class SimpleSearcher:
     def update_aliases(self, alias_map: Dict[str, str]):
         self.alias_map = alias_map
     
+    def add_alias(self, alias: str, canonical: str):
+        self.alias_map[alias.lower()] = canonical
+    
+    def remove_alias(self, alias: str):
+        self.alias_map.pop(alias.lower(), None)
+    
     def search(self, query: str, top_k: int = 6,
                group_id: Optional[str] = None) -> List[Dict]:
         """Simple keyword-based search"""
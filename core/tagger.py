@@ -3,7 +3,8 @@ Auto-tagging module for Limbus Guide Plugin
 Automatically tags chunks based on Limbus Company domain keywords
 """
 import re
-from typing import List, Dict, Set, Tuple
+from collections import Counter
+from typing import List, Dict, Set, Tuple, Optional
 
 
 class Tagger:
@@ -226,12 +227,15 @@ class Tagger:
         
         return name_mapping.get(name_lower, name)
     
-    def process_chunks(self, chunks: List[Dict]) -> List[Dict]:
+    def process_chunks(self, chunks: List[Dict],
+                       tag_counter: Optional[Counter] = None) -> List[Dict]:
         """
         Process multiple chunks and add tags/entities
         
         Args:
             chunks: List of chunk dicts with 'content' key
+            tag_counter: Optional Counter that accumulates tag frequencies
+                while tagging, avoiding a separate get_tag_statistics pass
             
         Returns:
             Chunks with 'tags' and 'entities' added
@@ -240,6 +244,8 @@ class Tagger:
             tags, entities = self.tag_chunk(chunk['content'])
             chunk['tags'] = tags
             chunk['entities'] = entities
+            if tag_counter is not None:
+                tag_counter.update(tags)
         
         return chunks
     
@@ -4,6 +4,7 @@ A RAG-based game guide query plugin for Limbus Company
 """
 import os
 import asyncio
+from collections import Counter
 from datetime import datetime
 from typing import Optional, Dict, Set
 
@@ -43,6 +44,10 @@ class LimbusGuidePlugin(Star):
         'message': ''
     }
     
+    # Minimum buffered characters before a streamed answer is flushed at a
+    # paragraph boundary, so streaming doesn't flood the chat with tiny messages
+    _STREAM_FLUSH_CHARS = 200
+    
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
         self.context = context
@@ -67,6 +72,7 @@ class LimbusGuidePlugin(Star):
         self.webui_host = config.get("webui_host", "0.0.0.0")
         self.webui_port = config.get("webui_port", 8765)
         self.webui_token = config.get("webui_token", "")
+        self.webui_debug = config.get("webui_debug", False)
         
         # Initialize components (will be set in initialize())
         self.db: Optional[Database] = None
@@ -189,6 +195,8 @@ class LimbusGuidePlugin(Star):
         """Rebuild search index from database"""
         chunks = await self.db.get_all_chunks_for_search(group_id)
         self.searcher.update_chunks(chunks)
+        if self.webui:
+            self.webui.invalidate_cache()
         logger.info(f"Search index rebuilt with {len(chunks)} chunks")
     
     async def _start_webui(self):
@@ -201,6 +209,7 @@ class LimbusGuidePlugin(Star):
                 'webui_host': self.webui_host,
                 'webui_port': self.webui_port,
                 'webui_token': self.webui_token,
+                'webui_debug': self.webui_debug,
                 'top_k': self.top_k,
                 'chunk_size': self.chunk_size,
                 'overlap': self.overlap,
@@ -412,37 +421,26 @@ Token：{self.webui_token}
         
         # Process document
         try:
-            doc_id = await self.db.add_document(
-                name=doc_name,
-                raw_text=full_text,
-                scope='group',
-                group_id=group_id
-            )
-            
             # Chunk and tag
+            tag_stats = Counter()
             chunks = self.chunker.process_document(full_text, doc_name)
-            chunks = self.tagger.process_chunks(chunks)
+            chunks = self.tagger.process_chunks(chunks, tag_counter=tag_stats)
             
-            # Save chunks
-            await self.db.add_chunks(
-                doc_id=doc_id,
+            # Save document, chunks and import time in a single transaction
+            await self.db.import_document(
+                name=doc_name,
+                raw_text=full_text,
                 chunks=chunks,
                 scope='group',
-                group_id=group_id
-            )
-            
-            # Update group settings
-            await self.db.update_group_settings(
-                group_id, 
+                group_id=group_id,
                 last_import_at=datetime.now().isoformat()
             )
             
             # Rebuild search index
             await self._rebuild_search_index()
             
-            # Get tag statistics
-            tag_stats = self.tagger.get_tag_statistics(chunks)
-            top_tags = list(tag_stats.items())[:5]
+            # Tag statistics were accumulated while tagging
+            top_tags = tag_stats.most_common(5)
             tags_summary = "\n".join(f"- {tag}: {count}次" for tag, count in top_tags)
             if not tags_summary:
                 tags_summary = "- 无标签"
@@ -557,6 +555,11 @@ Token：{self.webui_token}
             # Get LLM response
             provider = self.context.get_using_provider()
             if provider:
+                if hasattr(provider, 'text_chat_stream'):
+                    async for result in self._stream_llm_response(event, provider, llm_request):
+                        yield result
+                    return
+                
                 response = await provider.text_chat(**llm_request.__dict__)
                 if response and response.completion_text:
                     yield event.plain_result(response.completion_text)
@@ -569,6 +572,43 @@ Token：{self.webui_token}
             logger.error(f"LLM request failed: {e}")
             yield event.plain_result(f"❌ 查询失败：{str(e)}")
     
+    async def _stream_llm_response(self, event: AstrMessageEvent, provider, llm_request):
+        """Stream LLM output, flushing buffered text at paragraph boundaries"""
+        buffer = ""
+        received_chunks = False
+        sent_any = False
+        
+        try:
+            async for response in provider.text_chat_stream(**llm_request.__dict__):
+                if not response or not response.completion_text:
+                    continue
+                
+                if not getattr(response, 'is_chunk', False):
+                    # Final aggregated response: only needed if nothing was streamed
+                    if not received_chunks:
+                        buffer = response.completion_text
+                    continue
+                
+                received_chunks = True
+                buffer += response.completion_text
+                
+                cut = buffer.rfind("\n\n")
+                if cut >= self._STREAM_FLUSH_CHARS:
+                    yield event.plain_result(buffer[:cut].strip())
+                    buffer = buffer[cut + 2:]
+                    sent_any = True
+        except NotImplementedError:
+            # Provider declares streaming but doesn't implement it
+            if sent_any or received_chunks:
+                raise
+            response = await provider.text_chat(**llm_request.__dict__)
+            buffer = response.completion_text if response else ""
+        
+        if buffer.strip():
+            yield event.plain_result(buffer.strip())
+        elif not sent_any:
+            yield event.plain_result("❌ LLM响应为空，请稍后重试")
+    
     # ============ LLM Tool ============
     
     @filter.llm_tool(name="query_limbus_guide")
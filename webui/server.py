@@ -5,119 +5,175 @@ Provides REST API and simple HTML interface for knowledge base management
 """
 import os
 import asyncio
+import codecs
+import errno
 import secrets
 import socket
+import string
 import json
-from typing import Optional, Callable, Awaitable, List, Dict, Any
+import gzip
+import hashlib
+import hmac
+from collections import OrderedDict
+from functools import lru_cache
+from html import escape as _escape
+from urllib.parse import urlencode
+from typing import Optional, Callable, Awaitable, List, Dict, Any, Tuple
 from datetime import datetime
 
+from astrbot.api import logger
+
+# orjson is optional; without it JSON goes through the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Row templates for the document tables, filled with a single C-level %-format
+_GLOBAL_DOC_ROW_TPL = (
+    '<tr><td>%d</td><td>%s</td><td>%s</td><td>%s</td>'
+    '<td><button class="btn btn-danger" onclick="deleteDoc(%d)">&#128465;&#65039; 删除</button></td>'
+    '</tr>'
+)
+_GROUP_DOC_ROW_TPL = (
+    '<tr><td>%d</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td>'
+    '<td><button class="btn btn-danger" onclick="deleteDoc(%d)">&#128465;&#65039; 删除</button></td>'
+    '</tr>'
+)
+
 
 def _render_global_doc_rows(docs: List[Dict[str, Any]]) -> str:
     """Render HTML table rows for global documents."""
     if not docs:
         return '<tr><td colspan="5" class="empty-row">暂无文档</td></tr>'
-    rows = []
-    for doc in docs:
-        doc_id = doc['id']
-        row = (
-            '<tr>'
-            '<td>' + str(doc_id) + '</td>'
-            '<td>' + str(doc['name']) + '</td>'
-            '<td>' + '{:,}'.format(doc['raw_text_len']) + '</td>'
-            '<td>' + str(doc['created_at'][:19]) + '</td>'
-            '<td><button class="btn btn-danger" onclick="deleteDoc(' + str(doc_id) + ')">&#128465;&#65039; 删除</button></td>'
-            '</tr>'
+    tpl = _GLOBAL_DOC_ROW_TPL
+    return ''.join([
+        tpl % (
+            doc['id'], _escape(doc['name']), format(doc['raw_text_len'], ','),
+            doc['created_at'][:19], doc['id']
         )
-        rows.append(row)
-    return ''.join(rows)
+        for doc in docs
+    ])
 
 
 def _render_group_doc_rows(docs: List[Dict[str, Any]]) -> str:
     """Render HTML table rows for group documents."""
     if not docs:
         return '<tr><td colspan="6" class="empty-row">暂无文档</td></tr>'
-    rows = []
-    for doc in docs:
-        doc_id = doc['id']
-        row = (
-            '<tr>'
-            '<td>' + str(doc_id) + '</td>'
-            '<td>' + str(doc['name']) + '</td>'
-            '<td>' + str(doc['group_id']) + '</td>'
-            '<td>' + '{:,}'.format(doc['raw_text_len']) + '</td>'
-            '<td>' + str(doc['created_at'][:19]) + '</td>'
-            '<td><button class="btn btn-danger" onclick="deleteDoc(' + str(doc_id) + ')">&#128465;&#65039; 删除</button></td>'
-            '</tr>'
+    tpl = _GROUP_DOC_ROW_TPL
+    return ''.join([
+        tpl % (
+            doc['id'], _escape(doc['name']), _escape(doc['group_id']),
+            format(doc['raw_text_len'], ','), doc['created_at'][:19], doc['id']
         )
-        rows.append(row)
-    return ''.join(rows)
+        for doc in docs
+    ])
 
 
 def _render_group_tags(group_ids: List[str]) -> str:
     """Render HTML for group ID tags."""
     if not group_ids:
         return '<p class="empty-text">暂无群组数据</p>'
-    tags = ''.join('<span class="group-tag">' + str(gid) + '</span>' for gid in group_ids)
-    return '<div class="group-list">' + tags + '</div>'
+    tags = ''.join(['<span class="group-tag">%s</span>' % _escape(gid) for gid in group_ids])
+    return '<div class="group-list">%s</div>' % tags
 
 
 def _render_chunk_tags(tags: List[str]) -> str:
     """Render HTML for chunk tags."""
+    return _render_tag_set(tuple(tags))
+
+
+# Tags come from the tagger's fixed vocabulary, so chunks share a small
+# number of distinct tag lists; each one is rendered and escaped only once
+@lru_cache(maxsize=1024)
+def _render_tag_set(tags: Tuple[str, ...]) -> str:
     if not tags:
         return '<span style="color:#666;font-size:12px;">无标签</span>'
-    return ''.join('<span class="tag">' + str(tag) + '</span>' for tag in tags)
-
-
-def _render_chunks(chunks: List[Dict[str, Any]]) -> str:
-    """Render HTML for chunk display."""
-    if not chunks:
-        return '<p class="empty-text">暂无分块数据</p>'
-    result = []
-    for chunk in chunks:
-        scope_text = '&#127760; 全局' if chunk['scope'] == 'global' else '&#128101; 群组'
-        group_id = chunk.get('group_id') or ''
-        content = chunk['content']
-        content_display = content[:500] + ('...' if len(content) > 500 else '')
-        tags_html = _render_chunk_tags(chunk.get('tags', []))
-        html = (
-            '<div class="chunk">'
-            '<div class="chunk-header">'
-            '&#128290; 分块 #' + str(chunk['id']) + ' | &#128196; 文档 #' + str(chunk['doc_id']) + ' | ' +
-            scope_text + ' ' + str(group_id) +
-            '</div>'
-            '<div class="chunk-tags">' + tags_html + '</div>'
-            '<div class="chunk-content">' + content_display + '</div>'
-            '</div>'
-        )
-        result.append(html)
-    return ''.join(result)
+    return ''.join(['<span class="tag">%s</span>' % _escape(tag) for tag in tags])
 
 
-def _render_alias_rows(aliases: List[Dict[str, Any]], type_display: Dict[str, str]) -> str:
-    """Render HTML table rows for aliases."""
-    if not aliases:
-        return '<tr><td colspan="5" class="empty-row">暂无别名数据</td></tr>'
-    rows = []
-    for a in aliases:
-        alias_val = a['alias']
-        type_val = a['type']
-        type_text = type_display.get(type_val, type_val)
-        row = (
-            '<tr>'
-            '<td><strong>' + str(alias_val) + '</strong></td>'
-            '<td>' + str(a['canonical']) + '</td>'
-            '<td><span class="type-badge type-' + str(type_val) + '">' + type_text + '</span></td>'
-            '<td>' + str(a['created_at'][:19]) + '</td>'
-            "<td><button class=\"btn btn-danger\" onclick=\"deleteAlias('" + str(alias_val) + "')\">&#128465;&#65039; 删除</button></td>"
-            '</tr>'
-        )
-        rows.append(row)
-    return ''.join(rows)
+# Characters of chunk content shown on the chunks page
+_CHUNK_PREVIEW_CHARS = 500
 
 
-def _render_nav(token: str, active: str = '') -> str:
-    """Render navigation bar with active page highlighted."""
-    nav_items = [
+def _chunk_preview(content: str) -> str:
+    """Escaped, truncated chunk content for the chunks page"""
+    if len(content) > _CHUNK_PREVIEW_CHARS:
+        return _escape(content[:_CHUNK_PREVIEW_CHARS]) + '...'
+    return _escape(content)
+
+
+# Filter form and list heading of the chunks page: token, group_id, doc_id,
+# first and last position shown and total chunk count
+_CHUNKS_FILTERS_TPL = """
+        <div class="card">
+            <h2>🔎 筛选条件</h2>
+            <form method="get">
+                <input type="hidden" name="token" value="%s">
+                <div class="form-row">
+                    <input type="text" name="group_id" placeholder="输入群号筛选" value="%s">
+                    <input type="number" name="doc_id" placeholder="输入文档ID筛选" value="%s">
+                    <button type="submit" class="btn">&#128269; 筛选</button>
+                </div>
+            </form>
+        </div>
+        
+        <div class="card">
+            <h2>&#128203; 分块列表（第 %d-%d 条，共 %d 条）</h2>
+            """
+
+_EMPTY_CHUNKS_HTML = '<p class="empty-text">暂无分块数据</p>'
+
+# Previous/next page link of the chunks page: query string, label
+_CHUNKS_PAGER_LINK_TPL = '<a class="btn" href="/chunks-page?%s">%s</a>'
+_CHUNKS_LIST_END = b'\n        </div>\n'
+
+
+_CHUNK_TPL = (
+    '<div class="chunk">'
+    '<div class="chunk-header">'
+    '&#128290; 分块 #%d | &#128196; 文档 #%d | %s %s'
+    '</div>'
+    '<div class="chunk-tags">%s</div>'
+    '<div class="chunk-content">%s</div>'
+    '</div>'
+)
+
+
+def _render_chunk(chunk: Dict[str, Any]) -> str:
+    """Render HTML for a single chunk."""
+    scope_text = '&#127760; 全局' if chunk['scope'] == 'global' else '&#128101; 群组'
+    return _CHUNK_TPL % (
+        chunk['id'], chunk['doc_id'], scope_text, _escape(chunk.get('group_id') or ''),
+        _render_chunk_tags(chunk.get('tags', [])), _chunk_preview(chunk['content'])
+    )
+
+
+def _render_chunks_pager(token: str, group_id: Optional[str], doc_id: Optional[int],
+                         offset: int, total: int) -> str:
+    """Render previous/next links around the current chunks page"""
+    params = {'token': token}
+    if group_id:
+        params['group_id'] = group_id
+    if doc_id is not None:
+        params['doc_id'] = doc_id
+    links = []
+    if offset > 0:
+        params['offset'] = max(offset - _CHUNKS_PAGE_LIMIT, 0)
+        links.append(_CHUNKS_PAGER_LINK_TPL % (_escape(urlencode(params)), '&#11013;&#65039; 上一页'))
+    if offset + _CHUNKS_PAGE_LIMIT < total:
+        params['offset'] = offset + _CHUNKS_PAGE_LIMIT
+        links.append(_CHUNKS_PAGER_LINK_TPL % (_escape(urlencode(params)), '下一页 &#10145;&#65039;'))
+    if not links:
+        return ''
+    return '<div class="form-row">%s</div>' % ''.join(links)
+
+
+# Navigation entries: (key, link template taking the token, label)
+_NAV_ITEMS = tuple(
+    (key, '<a href="' + path + '?token=%s"', '>' + label + '</a>')
+    for path, label, key in (
         ('/', '&#128202; 状态总览', 'status'),
         ('/docs-page', '&#128196; 文档管理', 'docs'),
         ('/chunks-page', '&#128230; 分块浏览', 'chunks'),
@@ -126,230 +182,95 @@ def _render_nav(token: str, active: str = '') -> str:
         ('/model-settings-page', '&#9881;&#65039; 模型设置', 'model'),
         ('/template-page', '&#128203; 文档模版', 'template'),
         ('/status-mapping-page', '&#127991;&#65039; 状态映射', 'mapping'),
+    )
+)
+
+
+def _render_nav(token: str, active: str = '') -> str:
+    """Render navigation bar with active page highlighted."""
+    links = [
+        (href % _escape(token)) + (' class="active"' if key == active else '') + label
+        for key, href, label in _NAV_ITEMS
     ]
-    
-    links = []
-    for path, label, key in nav_items:
-        active_class = ' class="active"' if key == active else ''
-        links.append(f'<a href="{path}?token={token}"{active_class}>{label}</a>')
-    
     return '<nav>\n            ' + '\n            '.join(links) + '\n        </nav>'
 
 
+_STATUS_MAPPING_ROW_TPL = (
+    '<tr><td><strong>%s</strong></td><td>%s</td><td>%s</td><td>%s</td>'
+    '<td><button class="btn btn-danger" onclick="deleteMapping(%d)">&#128465;&#65039; 删除</button></td>'
+    '</tr>'
+)
+_TEMPLATE_ROW_TPL = (
+    '<tr><td><strong>%s</strong> %s</td><td>%s</td><td>%d 字符</td><td>%s</td>'
+    '<td>'
+    '<button class="btn btn-primary btn-sm" data-edit="%s">&#9998; 编辑</button> '
+    '<button class="btn btn-danger btn-sm" data-delete="%s">&#128465;&#65039; 删除</button>'
+    '</td>'
+    '</tr>'
+)
+_TEMPLATE_DEFAULT_BADGE = '<span class="badge badge-default">默认</span>'
+
+
 def _render_status_mapping_rows(mappings: List[Dict[str, Any]]) -> str:
     """Render HTML table rows for status mappings."""
     if not mappings:
         return '<tr><td colspan="5" class="empty-row">暂无状态映射数据</td></tr>'
-    rows = []
-    for m in mappings:
-        row = (
-            '<tr>'
-            '<td><strong>' + str(m['status_name']) + '</strong></td>'
-            '<td>' + str(m['subcategory']) + '</td>'
-            '<td>' + str(m['display_name']) + '</td>'
-            '<td>' + str(m.get('description', '') or '') + '</td>'
-            '<td><button class="btn btn-danger" onclick="deleteMapping(' + str(m['id']) + ')">&#128465;&#65039; 删除</button></td>'
-            '</tr>'
+    tpl = _STATUS_MAPPING_ROW_TPL
+    return ''.join([
+        tpl % (
+            _escape(m['status_name']), _escape(m['subcategory']), _escape(m['display_name']),
+            _escape(m.get('description', '') or ''), m['id']
         )
-        rows.append(row)
-    return ''.join(rows)
+        for m in mappings
+    ])
 
 
 def _render_template_rows(templates: List[Dict[str, Any]]) -> str:
     """Render HTML table rows for custom templates."""
     if not templates:
         return '<tr><td colspan="5" class="empty-row">暂无自定义模板</td></tr>'
+    tpl = _TEMPLATE_ROW_TPL
     rows = []
     for t in templates:
-        default_badge = '<span class="badge badge-default">默认</span>' if t.get('is_default') else ''
-        row = (
-            '<tr>'
-            '<td><strong>' + str(t['name']) + '</strong> ' + default_badge + '</td>'
-            '<td>' + str(t.get('description', '') or '') + '</td>'
-            '<td>' + str(len(t.get('content', ''))) + ' 字符</td>'
-            '<td>' + str(t['updated_at'][:19]) + '</td>'
-            "<td>"
-            "<button class=\"btn btn-primary btn-sm\" onclick=\"editTemplate('" + str(t['name']) + "')\">&#9998; 编辑</button> "
-            "<button class=\"btn btn-danger btn-sm\" onclick=\"deleteTemplate('" + str(t['name']) + "')\">&#128465;&#65039; 删除</button>"
-            "</td>"
-            '</tr>'
-        )
-        rows.append(row)
+        # Names go into data-* attributes, read back by the page script
+        name = _escape(t['name'])
+        rows.append(tpl % (
+            name, _TEMPLATE_DEFAULT_BADGE if t.get('is_default') else '',
+            _escape(t.get('description', '') or ''), len(t.get('content', '')),
+            t['updated_at'][:19], name, name
+        ))
     return ''.join(rows)
 
 
-def _check_port_available(host: str, port: int) -> bool:
-    """Check if a port is available for binding"""
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            # For 0.0.0.0, we check localhost since that's what matters for conflicts
-            check_host = '127.0.0.1' if host == '0.0.0.0' else host
-            sock.bind((check_host, port))
-            return True
-    except OSError:
-        return False
-
-
-# Delay in seconds to wait for server startup before checking status
-_SERVER_STARTUP_CHECK_DELAY = 0.5
-
-
-class WebUIServer:
-    """FastAPI-based WebUI server for knowledge base management"""
-    
-    def __init__(self, 
-                 db,  # Database instance
-                 chunker,  # Chunker instance
-                 tagger,  # Tagger instance
-                 searcher,  # Searcher instance
-                 config: dict,
-                 on_index_update: Optional[Callable[[], Awaitable[None]]] = None):
-        """
-        Initialize WebUI server
-        
-        Args:
-            db: Database instance
-            chunker: Chunker instance
-            tagger: Tagger instance
-            searcher: Searcher instance
-            config: Configuration dict with webui settings
-            on_index_update: Callback to rebuild search index after data changes
-        """
-        self.db = db
-        self.chunker = chunker
-        self.tagger = tagger
-        self.searcher = searcher
-        self.config = config
-        self.on_index_update = on_index_update
-        
-        self.host = config.get('webui_host', '0.0.0.0')
-        self.port = config.get('webui_port', 8765)
-        self.token = config.get('webui_token') or self._generate_token()
-        self.enabled = config.get('webui_enabled', True)
-        
-        self.app = None
-        self.server = None
-        self._server_task = None
-    
-    def _generate_token(self) -> str:
-        """Generate a secure random token"""
-        return secrets.token_urlsafe(32)
-    
-    def get_token(self) -> str:
-        """Get the current authentication token"""
-        return self.token
-    
-    def get_url(self) -> str:
-        """Get the WebUI URL"""
-        return f"http://{self.host}:{self.port}"
-    
-    async def start(self):
-        """Start the WebUI server
-        
-        Raises:
-            RuntimeError: If the port is not available or server fails to start
-        """
-        if not self.enabled:
-            return
-        
-        try:
-            from fastapi import FastAPI, HTTPException, Depends, Request, File, UploadFile, Form
-            from fastapi.responses import HTMLResponse, JSONResponse
-            from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-            from pydantic import BaseModel
-            import uvicorn
-        except ImportError:
-            # FastAPI not available, skip WebUI
-            raise RuntimeError(
-                "WebUI 依赖未安装。请运行: pip install fastapi uvicorn python-multipart"
-            )
-        
-        # Check if port is available before starting
-        if not _check_port_available(self.host, self.port):
-            raise RuntimeError(
-                f"端口 {self.port} 已被占用。请在配置中更改 webui_port，"
-                f"或检查是否有其他服务正在使用该端口。"
-            )
-        
-        app = FastAPI(title="Limbus Guide WebUI", version="1.0.0")
-        security = HTTPBearer(auto_error=False)
-        
-        # Token verification
-        async def verify_token(
-            request: Request,
-            credentials: HTTPAuthorizationCredentials = Depends(security)
-        ):
-            # Check header token
-            if credentials and credentials.credentials == self.token:
-                return True
-            
-            # Check query parameter token
-            token_param = request.query_params.get('token')
-            if token_param == self.token:
-                return True
-            
-            raise HTTPException(status_code=401, detail="Invalid or missing token")
-        
-        # Request models
-        class SearchRequest(BaseModel):
-            query: str
-            group_id: Optional[str] = None
-            top_k: int = 6
-        
-        class AliasRequest(BaseModel):
-            alias: str
-            canonical: str
-            type: str = 'other'
-        
-        # ============ HTML Pages ============
-        
-        @app.get("/", response_class=HTMLResponse)
-        async def index_page(request: Request, _=Depends(verify_token)):
-            """Main status page"""
-            stats = await self.db.get_stats()
-            group_ids = await self.db.get_all_group_ids()
-            
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>边狱巴士攻略管理</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
+# Styles shared by every WebUI page (page-specific rules are appended after it)
+_BASE_CSS = """
+        * { box-sizing: border-box; margin: 0; padding: 0; }
+        body { 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
             background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
             min-height: 100vh;
             color: #e0e0e0;
             line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
+        }
+        .container { max-width: 1200px; margin: 0 auto; padding: 20px; }
+        .header {
             background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
             padding: 30px;
             border-radius: 16px;
             margin-bottom: 20px;
             box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ 
-            color: #fff; 
-            font-size: 28px; 
-            font-weight: 700;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
-        nav {{
+        }
+        .header h1 { color: #fff; font-size: 28px; font-weight: 700; }
+        nav {
             background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
             padding: 15px 20px;
             border-radius: 12px;
             margin-bottom: 20px;
             display: flex;
             flex-wrap: wrap;
             gap: 10px;
-        }}
-        nav a {{
+        }
+        nav a {
             color: #e0e0e0;
             text-decoration: none;
             padding: 10px 20px;
@@ -357,89 +278,167 @@ class WebUIServer:
             background: rgba(255, 255, 255, 0.1);
             transition: all 0.3s ease;
             font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
+            --hover-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
+        }
+        nav a:hover, nav a.active {
             background: linear-gradient(90deg, #e94560, #ff6b6b);
             color: #fff;
             transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
+        }
+        /* Hover shadows live on a pre-painted pseudo-element and only fade its
+           opacity, so hovering never repaints the box-shadow itself. */
+        nav a, .btn, .chunk { position: relative; }
+        nav a::after, .btn::after, .chunk::after {
+            content: '';
+            position: absolute;
+            inset: 0;
+            border-radius: inherit;
+            box-shadow: var(--hover-shadow, none);
+            opacity: 0;
+            transition: opacity 0.3s ease;
+            pointer-events: none;
+        }
+        nav a:hover::after, nav a.active::after,
+        .btn:hover::after, .chunk:hover::after { opacity: 1; }
+        /* Only elements that lift on hover get a compositor layer, and only
+           while hovered, so idle pages don't hold one layer per button */
+        nav a:hover, .btn:hover, .chunk:hover, .result:hover, .stat:hover {
+            will-change: transform;
+        }
+        .card {
             background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
             padding: 25px;
             margin: 15px 0;
             border-radius: 16px;
             border: 1px solid rgba(255, 255, 255, 0.1);
             box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
+        }
+        .card h2 {
             color: #ff6b6b;
             font-size: 20px;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        .stat-grid {{
+        }
+        /* Tables, buttons and form controls shared by the management pages;
+           page styles only add their own sizes and colours on top */
+        table { width: 100%; border-collapse: collapse; margin-top: 15px; }
+        th, td { padding: 15px; text-align: left; border-bottom: 1px solid rgba(255, 255, 255, 0.1); }
+        th {
+            background: rgba(233, 69, 96, 0.2);
+            color: #ff6b6b;
+            font-weight: 600;
+            text-transform: uppercase;
+            font-size: 12px;
+            letter-spacing: 1px;
+        }
+        tr:hover { background: rgba(255, 255, 255, 0.05); }
+        .empty-row { color: #666; font-style: italic; text-align: center; }
+        .btn {
+            cursor: pointer;
+            border: none;
+            border-radius: 8px;
+            font-weight: 600;
+            transition: all 0.3s ease;
+        }
+        .btn:hover { transform: translateY(-2px); }
+        .btn-danger {
+            background: linear-gradient(90deg, #dc3545, #c82333);
+            color: white;
+            --hover-shadow: 0 4px 15px rgba(220, 53, 69, 0.4);
+        }
+        .btn-primary {
+            background: linear-gradient(90deg, #4ecca3, #38b984);
+            color: white;
+            --hover-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
+        }
+        .form-group { margin-bottom: 20px; }
+        .form-group label {
+            display: block;
+            margin-bottom: 8px;
+            color: #a0a0a0;
+            font-weight: 500;
+        }
+        input:focus, select:focus {
+            outline: none;
+            border-color: #4ecca3;
+        }
+        select option { background: #1a1a2e; color: #e0e0e0; }
+        .tag {
+            display: inline-block;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 4px 12px;
+            margin: 3px;
+            border-radius: 15px;
+            font-size: 12px;
+            color: #fff;
+        }
+"""
+
+
+_INDEX_PAGE_CSS = """
+        .header h1 { 
+            color: #fff; 
+            font-size: 28px; 
+            font-weight: 700;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
+        }
+        .stat-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
             gap: 20px;
-        }}
-        .stat {{
+        }
+        .stat {
             background: rgba(255, 255, 255, 0.05);
             padding: 20px;
             border-radius: 12px;
             text-align: center;
             transition: transform 0.3s ease;
-        }}
-        .stat:hover {{ transform: translateY(-5px); }}
-        .stat-value {{ 
+        }
+        .stat:hover { transform: translateY(-5px); }
+        .stat-value { 
             font-size: 32px; 
             font-weight: bold; 
             color: #4ecca3;
             text-shadow: 0 0 20px rgba(78, 204, 163, 0.3);
-        }}
-        .stat-label {{ color: #a0a0a0; font-size: 14px; margin-top: 8px; }}
-        .warning {{
+        }
+        .stat-label { color: #a0a0a0; font-size: 14px; margin-top: 8px; }
+        .warning {
             background: linear-gradient(90deg, rgba(255, 193, 7, 0.2), rgba(255, 152, 0, 0.2));
             border-left: 4px solid #ffc107;
             padding: 15px 20px;
             border-radius: 8px;
             margin: 15px 0;
             color: #ffd54f;
-        }}
-        .config-item {{
+        }
+        .config-item {
             display: flex;
             justify-content: space-between;
             padding: 12px 0;
             border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        .config-item:last-child {{ border-bottom: none; }}
-        .config-label {{ color: #a0a0a0; }}
-        .config-value {{ color: #4ecca3; font-weight: 600; }}
-        .group-list {{
+        }
+        .config-item:last-child { border-bottom: none; }
+        .config-label { color: #a0a0a0; }
+        .config-value { color: #4ecca3; font-weight: 600; }
+        .group-list {
             display: flex;
             flex-wrap: wrap;
             gap: 10px;
             margin-top: 15px;
-        }}
-        .group-tag {{
+        }
+        .group-tag {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 8px 16px;
             border-radius: 20px;
             font-size: 14px;
-        }}
-        .empty-text {{ color: #666; font-style: italic; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📚 边狱巴士攻略管理系统</h1>
-        </div>
-        
-        {_render_nav(self.token, 'status')}
-        
+        }
+        .empty-text { color: #666; font-style: italic; }
+"""
+
+
+# Status page sections; runtime and config are filled once per server
+# start, the statistics card on every request
+_INDEX_RUNTIME_TPL = """
         <div class="warning">
             &#9888;&#65039; <strong>安全提示</strong>：请勿泄露URL中的Token，建议使用Nginx反向代理并启用HTTPS加密。
         </div>
@@ -452,419 +451,210 @@ class WebUIServer:
                     <div class="stat-label">服务状态：运行中</div>
                 </div>
                 <div class="stat">
-                    <div class="stat-value" style="font-size: 18px;">{self.host}:{self.port}</div>
+                    <div class="stat-value" style="font-size: 18px;">%s:%s</div>
                     <div class="stat-label">监听地址</div>
                 </div>
             </div>
         </div>
         
-        <div class="card">
+"""
+
+_INDEX_STATS_TPL = """        <div class="card">
             <h2>&#128200; 知识库统计</h2>
             <div class="stat-grid">
                 <div class="stat">
-                    <div class="stat-value">{stats['global']['doc_count']}</div>
+                    <div class="stat-value">%d</div>
                     <div class="stat-label">全局文档数</div>
                 </div>
                 <div class="stat">
-                    <div class="stat-value">{stats['global']['chunk_count']}</div>
+                    <div class="stat-value">%d</div>
                     <div class="stat-label">全局分块数</div>
                 </div>
                 <div class="stat">
-                    <div class="stat-value">{len(group_ids)}</div>
+                    <div class="stat-value">%d</div>
                     <div class="stat-label">群组数量</div>
                 </div>
             </div>
         </div>
         
-        <div class="card">
+""".encode('utf-8')
+
+_INDEX_CONFIG_TPL = """        <div class="card">
             <h2>&#9881;&#65039; 配置信息</h2>
             <div class="config-item">
                 <span class="config-label">检索返回数量 (TopK)</span>
-                <span class="config-value">{self.config.get('top_k', 6)}</span>
+                <span class="config-value">%s</span>
             </div>
             <div class="config-item">
                 <span class="config-label">分块大小</span>
-                <span class="config-value">{self.config.get('chunk_size', 800)} 字符</span>
+                <span class="config-value">%s 字符</span>
             </div>
             <div class="config-item">
                 <span class="config-label">分块重叠</span>
-                <span class="config-value">{self.config.get('overlap', 120)} 字符</span>
+                <span class="config-value">%s 字符</span>
             </div>
             <div class="config-item">
                 <span class="config-label">群覆盖加权</span>
-                <span class="config-value">{self.config.get('group_boost', 1.2)}x</span>
+                <span class="config-value">%sx</span>
             </div>
         </div>
         
-        <div class="card">
+"""
+
+_INDEX_GROUPS_HEAD = '''        <div class="card">
             <h2>&#128101; 群组列表</h2>
-            {_render_group_tags(group_ids)}
+            '''.encode('utf-8')
+_INDEX_GROUPS_END = b'\n        </div>\n'
+
+
+# Upload form and document tables of the documents page; only the counts
+# and table rows change between requests
+_DOCS_UPLOAD_HTML = """
+        <div class="card">
+            <h2>&#128228; 上传文档</h2>
+            <form id="uploadForm" enctype="multipart/form-data">
+                <div class="form-group">
+                    <label>选择文件（支持 .txt, .md）</label>
+                    <input type="file" name="file" accept=".txt,.md" required>
+                </div>
+                <div class="form-group">
+                    <label>存储范围</label>
+                    <select name="scope" id="scopeSelect">
+                        <option value="global">&#127760; 全局知识库</option>
+                        <option value="group">&#128101; 群覆盖库</option>
+                    </select>
+                </div>
+                <div class="form-group" id="groupIdDiv" style="display:none;">
+                    <label>群号</label>
+                    <input type="text" name="group_id" placeholder="请输入群号">
+                </div>
+                <button type="submit" class="btn btn-primary">&#128228; 上传文档</button>
+            </form>
         </div>
-    </div>
-</body>
-</html>
-"""
-            return HTMLResponse(content=html)
         
-        @app.get("/docs-page", response_class=HTMLResponse)
-        async def docs_page(request: Request, _=Depends(verify_token)):
-            """Document management page"""
-            global_docs = await self.db.get_documents(scope='global')
-            group_docs = await self.db.get_documents(scope='group')
-            
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>文档管理 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-        th, td {{ padding: 15px; text-align: left; border-bottom: 1px solid rgba(255, 255, 255, 0.1); }}
-        th {{ 
-            background: rgba(233, 69, 96, 0.2); 
-            color: #ff6b6b;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 12px;
-            letter-spacing: 1px;
-        }}
-        tr:hover {{ background: rgba(255, 255, 255, 0.05); }}
-        .btn {{
-            padding: 10px 20px;
-            cursor: pointer;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            font-size: 14px;
-        }}
-        .btn-danger {{
-            background: linear-gradient(90deg, #dc3545, #c82333);
-            color: white;
-        }}
-        .btn-danger:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.4);
-        }}
-        .btn-primary {{
-            background: linear-gradient(90deg, #4ecca3, #38b984);
-            color: white;
-        }}
-        .btn-primary:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
-        }}
-        .form-group {{
-            margin-bottom: 20px;
-        }}
-        .form-group label {{
-            display: block;
-            margin-bottom: 8px;
-            color: #a0a0a0;
-            font-weight: 500;
-        }}
-        input[type="file"], input[type="text"], select {{
-            width: 100%;
-            padding: 12px 16px;
-            border: 2px solid rgba(255, 255, 255, 0.1);
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.05);
+""".encode('utf-8')
+_DOCS_LIST_TPL = """        <div class="card">
+            <h2>&#127760; 全局知识库 (%d 篇文档)</h2>
+            <table>
+                <tr><th>ID</th><th>文档名称</th><th>字符数</th><th>创建时间</th><th>操作</th></tr>
+                %s
+            </table>
+            <div style="margin-top: 20px;">
+                <button class="btn btn-danger" onclick="clearGlobal()">&#9888;&#65039; 清空全局库</button>
+            </div>
+        </div>
+        
+        <div class="card">
+            <h2>&#128101; 群覆盖库 (%d 篇文档)</h2>
+            <table>
+                <tr><th>ID</th><th>文档名称</th><th>群号</th><th>字符数</th><th>创建时间</th><th>操作</th></tr>
+                %s
+            </table>
+        </div>
+"""
+
+
+_DOCS_PAGE_CSS = """
+        .btn {
+            padding: 10px 20px;
+            font-size: 14px;
+        }
+        input[type="file"], input[type="text"], select {
+            width: 100%;
+            padding: 12px 16px;
+            border: 2px solid rgba(255, 255, 255, 0.1);
+            border-radius: 8px;
+            background: rgba(255, 255, 255, 0.05);
             color: #e0e0e0;
             font-size: 14px;
             transition: border-color 0.3s ease;
-        }}
-        input:focus, select:focus {{
-            outline: none;
-            border-color: #4ecca3;
-        }}
-        select option {{ background: #1a1a2e; color: #e0e0e0; }}
-        .empty-row {{ color: #666; font-style: italic; text-align: center; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#128196; 文档管理</h1>
-        </div>
-        
-        {_render_nav(self.token, 'docs')}
-        
-        <div class="card">
-            <h2>&#128228; 上传文档</h2>
-            <form id="uploadForm" enctype="multipart/form-data">
-                <div class="form-group">
-                    <label>选择文件（支持 .txt, .md）</label>
-                    <input type="file" name="file" accept=".txt,.md" required>
-                </div>
-                <div class="form-group">
-                    <label>存储范围</label>
-                    <select name="scope" id="scopeSelect">
-                        <option value="global">&#127760; 全局知识库</option>
-                        <option value="group">&#128101; 群覆盖库</option>
-                    </select>
-                </div>
-                <div class="form-group" id="groupIdDiv" style="display:none;">
-                    <label>群号</label>
-                    <input type="text" name="group_id" placeholder="请输入群号">
-                </div>
-                <button type="submit" class="btn btn-primary">&#128228; 上传文档</button>
-            </form>
-        </div>
-        
-        <div class="card">
-            <h2>&#127760; 全局知识库 ({len(global_docs)} 篇文档)</h2>
-            <table>
-                <tr><th>ID</th><th>文档名称</th><th>字符数</th><th>创建时间</th><th>操作</th></tr>
-                {_render_global_doc_rows(global_docs)}
-            </table>
-            <div style="margin-top: 20px;">
-                <button class="btn btn-danger" onclick="clearGlobal()">&#9888;&#65039; 清空全局库</button>
-            </div>
-        </div>
-        
-        <div class="card">
-            <h2>&#128101; 群覆盖库 ({len(group_docs)} 篇文档)</h2>
-            <table>
-                <tr><th>ID</th><th>文档名称</th><th>群号</th><th>字符数</th><th>创建时间</th><th>操作</th></tr>
-                {_render_group_doc_rows(group_docs)}
-            </table>
-        </div>
-    </div>
-    
-    <script>
-        const token = '{self.token}';
-        
-        document.getElementById('scopeSelect').onchange = function() {{
+        }
+"""
+
+
+# Upload/delete logic for the docs page, served from /static/docs.js
+_DOCS_PAGE_JS = """
+        document.getElementById('scopeSelect').onchange = function() {
             document.getElementById('groupIdDiv').style.display = 
                 this.value === 'group' ? 'block' : 'none';
-        }};
+        };
         
-        document.getElementById('uploadForm').onsubmit = async function(e) {{
+        document.getElementById('uploadForm').onsubmit = async function(e) {
             e.preventDefault();
             const formData = new FormData(this);
-            try {{
-                const resp = await fetch('/docs/upload?token=' + token, {{
+            try {
+                const resp = await fetch('/docs/upload?token=' + token, {
                     method: 'POST',
                     body: formData
-                }});
+                });
                 const data = await resp.json();
-                if (resp.ok) {{
-                    alert('&#9989; 上传成功！');
+                if (resp.ok) {
+                    alert(data.index_updating ? '&#9989; 上传成功！检索索引正在后台更新' : '&#9989; 上传成功！');
                     location.reload();
-                }} else {{
+                } else {
                     alert('&#10060; 上传失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
+                }
+            } catch (err) {
                 alert('&#10060; 上传失败：' + err.message);
-            }}
-        }};
+            }
+        };
         
-        async function deleteDoc(docId) {{
+        async function deleteDoc(docId) {
             if (!confirm('确定要删除这个文档吗？')) return;
-            try {{
-                const resp = await fetch('/docs/' + docId + '?token=' + token, {{
+            try {
+                const resp = await fetch('/docs/' + docId + '?token=' + token, {
                     method: 'DELETE'
-                }});
-                if (resp.ok) {{
+                });
+                if (resp.ok) {
                     location.reload();
-                }} else {{
+                } else {
                     const data = await resp.json();
                     alert('&#10060; 删除失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
+                }
+            } catch (err) {
                 alert('&#10060; 删除失败：' + err.message);
-            }}
-        }}
+            }
+        }
         
-        async function clearGlobal() {{
+        async function clearGlobal() {
             if (!confirm('&#9888;&#65039; 确定要清空整个全局库吗？此操作不可恢复！')) return;
             if (!confirm('&#9888;&#65039; 再次确认：真的要清空全局库吗？')) return;
-            try {{
-                const resp = await fetch('/docs/clear?scope=global&token=' + token, {{
+            try {
+                const resp = await fetch('/docs/clear?scope=global&token=' + token, {
                     method: 'DELETE'
-                }});
-                if (resp.ok) {{
+                });
+                if (resp.ok) {
                     location.reload();
-                }} else {{
+                } else {
                     const data = await resp.json();
                     alert('&#10060; 清空失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
+                }
+            } catch (err) {
                 alert('&#10060; 清空失败：' + err.message);
-            }}
-        }}
-    </script>
-</body>
-</html>
+            }
+        }
 """
-            return HTMLResponse(content=html)
-        
-        @app.get("/chunks-page", response_class=HTMLResponse)
-        async def chunks_page(
-            request: Request,
-            group_id: Optional[str] = None,
-            doc_id: Optional[int] = None,
-            _=Depends(verify_token)
-        ):
-            """Chunk browsing page"""
-            chunks = await self.db.get_chunks(group_id=group_id, doc_id=doc_id)
-            chunks = chunks[:100]  # Limit to 100 for display
-            
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>分块浏览 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        .chunk {{
+
+
+_CHUNKS_PAGE_CSS = """
+        .chunk {
             background: rgba(255, 255, 255, 0.05);
             border: 1px solid rgba(255, 255, 255, 0.1);
             margin: 15px 0;
             padding: 20px;
             border-radius: 12px;
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
-        .chunk:hover {{
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.3);
-        }}
-        .chunk-header {{
+            transition: transform 0.3s ease;
+            --hover-shadow: 0 8px 25px rgba(0, 0, 0, 0.3);
+        }
+        .chunk:hover { transform: translateY(-3px); }
+        .chunk-header {
             font-weight: 600;
             color: #4ecca3;
             margin-bottom: 10px;
             font-size: 14px;
-        }}
-        .chunk-tags {{ margin: 10px 0; }}
-        .tag {{
-            display: inline-block;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 4px 12px;
-            margin: 3px;
-            border-radius: 15px;
-            font-size: 12px;
-            color: #fff;
-        }}
-        .chunk-content {{
+        }
+        .chunk-tags { margin: 10px 0; }
+        .chunk-content {
             white-space: pre-wrap;
             font-size: 14px;
             max-height: 200px;
@@ -874,14 +664,14 @@ class WebUIServer:
             border-radius: 8px;
             color: #c0c0c0;
             line-height: 1.8;
-        }}
-        .form-row {{
+        }
+        .form-row {
             display: flex;
             gap: 15px;
             align-items: center;
             flex-wrap: wrap;
-        }}
-        input[type="text"], input[type="number"] {{
+        }
+        input[type="text"], input[type="number"] {
             padding: 12px 16px;
             border: 2px solid rgba(255, 255, 255, 0.1);
             border-radius: 8px;
@@ -889,127 +679,20 @@ class WebUIServer:
             color: #e0e0e0;
             font-size: 14px;
             transition: border-color 0.3s ease;
-        }}
-        input:focus {{ outline: none; border-color: #4ecca3; }}
-        .btn {{
+        }
+        .btn {
             padding: 12px 24px;
-            cursor: pointer;
-            border: none;
-            border-radius: 8px;
             background: linear-gradient(90deg, #4ecca3, #38b984);
             color: white;
-            font-weight: 600;
-            transition: all 0.3s ease;
-        }}
-        .btn:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
-        }}
-        .empty-text {{ color: #666; font-style: italic; text-align: center; padding: 40px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#128230; 分块浏览</h1>
-        </div>
-        
-        {_render_nav(self.token, 'chunks')}
-        
-        <div class="card">
-            <h2>🔎 筛选条件</h2>
-            <form method="get">
-                <input type="hidden" name="token" value="{self.token}">
-                <div class="form-row">
-                    <input type="text" name="group_id" placeholder="输入群号筛选" value="{group_id or ''}">
-                    <input type="number" name="doc_id" placeholder="输入文档ID筛选" value="{doc_id or ''}">
-                    <button type="submit" class="btn">&#128269; 筛选</button>
-                </div>
-            </form>
-        </div>
-        
-        <div class="card">
-            <h2>&#128203; 分块列表（显示前100条，共 {len(chunks)} 条）</h2>
-            {_render_chunks(chunks)}
-        </div>
-    </div>
-</body>
-</html>
+            --hover-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
+        }
+        .empty-text { color: #666; font-style: italic; text-align: center; padding: 40px; }
 """
-            return HTMLResponse(content=html)
-        
-        @app.get("/search-page", response_class=HTMLResponse)
-        async def search_page(request: Request, _=Depends(verify_token)):
-            """Search debugging page"""
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>检索调试 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        .form-group {{ margin-bottom: 15px; }}
-        .form-group label {{ display: block; margin-bottom: 8px; color: #a0a0a0; font-weight: 500; }}
-        input[type="text"], input[type="number"] {{
+
+
+_SEARCH_PAGE_CSS = """
+        .form-group { margin-bottom: 15px; }
+        input[type="text"], input[type="number"] {
             width: 100%;
             max-width: 400px;
             padding: 12px 16px;
@@ -1019,57 +702,48 @@ class WebUIServer:
             color: #e0e0e0;
             font-size: 14px;
             transition: border-color 0.3s ease;
-        }}
-        input:focus {{ outline: none; border-color: #4ecca3; }}
-        .inline-group {{ display: flex; gap: 15px; align-items: center; }}
-        .inline-group input {{ width: 100px; }}
-        .btn {{
+        }
+        .inline-group { display: flex; gap: 15px; align-items: center; }
+        .inline-group input { width: 100px; }
+        .btn {
             padding: 12px 24px;
-            cursor: pointer;
-            border: none;
-            border-radius: 8px;
             background: linear-gradient(90deg, #4ecca3, #38b984);
             color: white;
-            font-weight: 600;
-            transition: all 0.3s ease;
             font-size: 14px;
-        }}
-        .btn:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
-        }}
-        .result {{
+            --hover-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
+        }
+        .result {
             background: rgba(255, 255, 255, 0.05);
             border: 1px solid rgba(255, 255, 255, 0.1);
             margin: 15px 0;
             padding: 20px;
             border-radius: 12px;
             transition: transform 0.3s ease;
-        }}
-        .result:hover {{ transform: translateY(-3px); }}
-        .result-header {{
+        }
+        .result:hover { transform: translateY(-3px); }
+        .result-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 10px;
-        }}
-        .result-info {{ color: #a0a0a0; font-size: 14px; }}
-        .score {{
+        }
+        .result-info { color: #a0a0a0; font-size: 14px; }
+        .score {
             background: linear-gradient(90deg, #4ecca3, #38b984);
             padding: 6px 12px;
             border-radius: 20px;
             font-weight: 600;
             font-size: 14px;
-        }}
-        .breakdown {{
+        }
+        .breakdown {
             color: #666;
             font-size: 12px;
             margin: 10px 0;
             padding: 10px;
             background: rgba(0, 0, 0, 0.2);
             border-radius: 6px;
-        }}
-        .content {{
+        }
+        .content {
             white-space: pre-wrap;
             font-size: 14px;
             margin-top: 15px;
@@ -1079,39 +753,23 @@ class WebUIServer:
             max-height: 150px;
             overflow-y: auto;
             color: #c0c0c0;
-        }}
-        .tag {{
-            display: inline-block;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 4px 12px;
-            margin: 3px;
-            border-radius: 15px;
-            font-size: 12px;
-            color: #fff;
-        }}
-        .tag.matched {{
+        }
+        .tag.matched {
             background: linear-gradient(90deg, #4ecca3, #38b984);
-        }}
-        .query-info {{
+        }
+        .query-info {
             background: rgba(78, 204, 163, 0.1);
             border-left: 4px solid #4ecca3;
             padding: 15px 20px;
             border-radius: 8px;
             margin: 15px 0;
-        }}
-        .query-info strong {{ color: #4ecca3; }}
-        #results {{ display: none; }}
-        .empty-text {{ color: #666; font-style: italic; text-align: center; padding: 40px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#128269; 检索调试</h1>
-        </div>
-        
-        {_render_nav(self.token, 'search')}
-        
+        }
+        .query-info strong { color: #4ecca3; }
+        #results { display: none; }
+        .empty-text { color: #666; font-style: italic; text-align: center; padding: 40px; }
+"""
+
+_SEARCH_PAGE_HTML = """
         <div class="card">
             <h2>🔎 搜索测试</h2>
             <form id="searchForm">
@@ -1138,197 +796,91 @@ class WebUIServer:
             <div id="queryInfo" class="query-info"></div>
             <div id="resultsList"></div>
         </div>
-    </div>
-    
-    <script>
-        const token = '{self.token}';
-        
-        document.getElementById('searchForm').onsubmit = async function(e) {{
+"""
+
+_SEARCH_PAGE_JS = """
+        function el(tag, className, text) {
+            const node = document.createElement(tag);
+            node.className = className;
+            if (text !== undefined) node.textContent = text;
+            return node;
+        }
+        
+        document.getElementById('searchForm').onsubmit = async function(e) {
             e.preventDefault();
             const query = document.getElementById('query').value;
             const groupId = document.getElementById('groupId').value;
             const topK = parseInt(document.getElementById('topK').value);
             
-            try {{
-                const resp = await fetch('/search?token=' + token, {{
+            try {
+                const resp = await fetch('/search?debug=1&token=' + token, {
                     method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify({{query, group_id: groupId || null, top_k: topK}})
-                }});
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({query, group_id: groupId || null, top_k: topK})
+                });
                 const data = await resp.json();
                 
                 document.getElementById('results').style.display = 'block';
                 
                 // Query info
-                const info = data.query_info || {{}};
-                document.getElementById('queryInfo').innerHTML = `
-                    <strong>&#128203; 查询分析</strong><br><br>
-                    <b>原始查询：</b>${{info.original_query || query}}<br>
-                    <b>处理后：</b>${{info.processed_query || query}}<br>
-                    <b>提取标签：</b>${{(info.extracted_tags || []).join(', ') || '无'}}<br>
-                    <b>别名替换：</b>${{(info.alias_substitutions || []).join(', ') || '无'}}
-                `;
+                // Values echo user input, so they go in as text, never as markup
+                const info = data.query_info || {};
+                const queryInfo = document.getElementById('queryInfo');
+                queryInfo.innerHTML = '<strong>&#128203; 查询分析</strong><br><br>';
+                for (const [label, value] of [
+                    ['原始查询：', info.original_query || query],
+                    ['处理后：', info.processed_query || query],
+                    ['提取标签：', (info.extracted_tags || []).join(', ') || '无'],
+                    ['别名替换：', (info.alias_substitutions || []).join(', ') || '无'],
+                ]) {
+                    queryInfo.appendChild(el('b', '', label));
+                    queryInfo.append(value, document.createElement('br'));
+                }
                 
                 // Results
                 const results = data.results || [];
-                if (results.length === 0) {{
+                if (results.length === 0) {
                     document.getElementById('resultsList').innerHTML = '<p class="empty-text">未找到匹配结果</p>';
-                }} else {{
-                    document.getElementById('resultsList').innerHTML = results.map((r, i) => `
-                        <div class="result">
-                            <div class="result-header">
-                                #${{i+1}} | Chunk ${{r.id}} | 
-                                ${{r.scope}} ${{r.group_id ? ['(', r.group_id, ')'].join('') : ''}}
-                                <span class="score">得分: ${{r.score.toFixed(3)}}</span>
-                            </div>
-                            <div class="breakdown">
-                                &#128202; BM25: ${{r.score_breakdown?.bm25?.toFixed(3) || 0}} |
-                                &#127991;&#65039; 标签加权: ${{r.score_breakdown?.tag_boost?.toFixed(3) || 0}} |
-                                &#128101; 群加权: ${{r.score_breakdown?.group_boost?.toFixed(3) || 0}}
-                            </div>
-                            <div>
-                                ${{(r.tags || []).map(t => 
-                                    `<span class="tag ${{(r.score_breakdown?.matching_tags || []).includes(t) ? 'matched' : ''}}">${{t}}</span>`
-                                ).join('')}}
-                            </div>
-                            <div class="content">${{r.content.substring(0, 400)}}${{r.content.length > 400 ? '...' : ''}}</div>
-                        </div>
-                    `).join('');
-                }}
-            }} catch (err) {{
+                } else {
+                    // Build the list off-document and swap it in with a single
+                    // replaceChildren, so the browser lays it out only once
+                    const frag = document.createDocumentFragment();
+                    for (const [i, r] of results.entries()) {
+                        const breakdown = r.score_breakdown || {};
+                        const matching = breakdown.matching_tags || [];
+                        const div = el('div', 'result');
+                        const header = el('div', 'result-header',
+                            `#${i+1} | Chunk ${r.id} | ${r.scope} ${r.group_id ? '(' + r.group_id + ')' : ''} `);
+                        header.appendChild(el('span', 'score', `得分: ${r.score.toFixed(3)}`));
+                        div.appendChild(header);
+                        div.appendChild(el('div', 'breakdown',
+                            `\\u{1F4CA} BM25: ${breakdown.bm25?.toFixed(3) || 0} | ` +
+                            `\\u{1F3F7}\\uFE0F 标签加权: ${breakdown.tag_boost?.toFixed(3) || 0} | ` +
+                            `\\u{1F465} 群加权: ${breakdown.group_boost?.toFixed(3) || 0}`));
+                        const tags = document.createElement('div');
+                        for (const t of r.tags || []) {
+                            tags.appendChild(el('span', matching.includes(t) ? 'tag matched' : 'tag', t));
+                        }
+                        div.appendChild(tags);
+                        div.appendChild(el('div', 'content',
+                            r.content.substring(0, 400) + (r.content.length > 400 ? '...' : '')));
+                        frag.appendChild(div);
+                    }
+                    document.getElementById('resultsList').replaceChildren(frag);
+                }
+            } catch (err) {
                 alert('&#10060; 搜索失败：' + err.message);
-            }}
-        }};
-    </script>
-</body>
-</html>
-"""
-            return HTMLResponse(content=html)
-        
-        @app.get("/aliases-page", response_class=HTMLResponse)
-        async def aliases_page(request: Request, _=Depends(verify_token)):
-            """Alias management page"""
-            aliases = await self.db.get_aliases()
-            
-            # Type display mapping
-            type_display = {
-                'identity': '&#128100; 人格',
-                'ego': '&#127917; EGO',
-                'status': '&#9889; 状态',
-                'mode': '&#127918; 模式',
-                'other': '&#128203; 其他'
             }
-            
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>别名词典 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-        th, td {{ padding: 15px; text-align: left; border-bottom: 1px solid rgba(255, 255, 255, 0.1); }}
-        th {{ 
-            background: rgba(233, 69, 96, 0.2); 
-            color: #ff6b6b;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 12px;
-            letter-spacing: 1px;
-        }}
-        tr:hover {{ background: rgba(255, 255, 255, 0.05); }}
-        .btn {{
+        };
+"""
+
+
+_ALIASES_PAGE_CSS = """
+        .btn {
             padding: 10px 20px;
-            cursor: pointer;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            transition: all 0.3s ease;
             font-size: 14px;
-        }}
-        .btn-danger {{
-            background: linear-gradient(90deg, #dc3545, #c82333);
-            color: white;
-        }}
-        .btn-danger:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.4);
-        }}
-        .btn-primary {{
-            background: linear-gradient(90deg, #4ecca3, #38b984);
-            color: white;
-        }}
-        .btn-primary:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(78, 204, 163, 0.4);
-        }}
-        .form-group {{ margin-bottom: 20px; }}
-        .form-group label {{
-            display: block;
-            margin-bottom: 8px;
-            color: #a0a0a0;
-            font-weight: 500;
-        }}
-        input[type="text"], select {{
+        }
+        input[type="text"], select {
             width: 100%;
             max-width: 400px;
             padding: 12px 16px;
@@ -1338,32 +890,31 @@ class WebUIServer:
             color: #e0e0e0;
             font-size: 14px;
             transition: border-color 0.3s ease;
-        }}
-        input:focus, select:focus {{ outline: none; border-color: #4ecca3; }}
-        select option {{ background: #1a1a2e; color: #e0e0e0; }}
-        .empty-row {{ color: #666; font-style: italic; text-align: center; }}
-        .type-badge {{
+        }
+        .type-badge {
             display: inline-block;
             padding: 4px 10px;
             border-radius: 12px;
             font-size: 12px;
             font-weight: 500;
-        }}
-        .type-identity {{ background: linear-gradient(135deg, #667eea, #764ba2); }}
-        .type-ego {{ background: linear-gradient(135deg, #f093fb, #f5576c); }}
-        .type-status {{ background: linear-gradient(135deg, #4facfe, #00f2fe); }}
-        .type-mode {{ background: linear-gradient(135deg, #43e97b, #38f9d7); }}
-        .type-other {{ background: linear-gradient(135deg, #fa709a, #fee140); }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#128221; 别名词典</h1>
-        </div>
-        
-        {_render_nav(self.token, 'aliases')}
-        
+        }
+        .type-identity { background: linear-gradient(135deg, #667eea, #764ba2); }
+        .type-ego { background: linear-gradient(135deg, #f093fb, #f5576c); }
+        .type-status { background: linear-gradient(135deg, #4facfe, #00f2fe); }
+        .type-mode { background: linear-gradient(135deg, #43e97b, #38f9d7); }
+        .type-other { background: linear-gradient(135deg, #fa709a, #fee140); }
+"""
+
+# Alias type -> badge label on the alias management page
+_ALIAS_TYPE_DISPLAY = {
+    'identity': '&#128100; 人格',
+    'ego': '&#127917; EGO',
+    'status': '&#9889; 状态',
+    'mode': '&#127918; 模式',
+    'other': '&#128203; 其他'
+}
+
+_ALIASES_PAGE_HTML = """
         <div class="card">
             <h2>&#10133; 添加别名</h2>
             <form id="aliasForm">
@@ -1389,191 +940,161 @@ class WebUIServer:
             </form>
         </div>
         
-        <div class="card">
-            <h2>&#128203; 别名列表（共 {len(aliases)} 条）</h2>
+"""
+
+_ALIASES_LIST_HTML = """        <div class="card">
+            <h2>&#128203; 别名列表（共 <span id="aliasCount">0</span> 条）</h2>
             <table>
-                <tr><th>别名</th><th>标准名</th><th>类型</th><th>创建时间</th><th>操作</th></tr>
-                {_render_alias_rows(aliases, type_display)}
+                <thead><tr><th>别名</th><th>标准名</th><th>类型</th><th>创建时间</th><th>操作</th></tr></thead>
+                <tbody id="aliasBody"><tr><td colspan="5" class="empty-row">加载中...</td></tr></tbody>
             </table>
         </div>
-    </div>
-    
-    <script>
-        const token = '{self.token}';
+"""
+
+# The alias table is filled in the browser from GET /aliases, so the page
+# itself is static and the handler never touches the database
+_ALIASES_PAGE_JS = "const TYPE_DISPLAY = " + json.dumps(_ALIAS_TYPE_DISPLAY, ensure_ascii=False) + ";\n" + """
+        function escapeHtml(value) {
+            return String(value).replace(/[&<>"']/g, c => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[c]);
+        }
+        
+        async function loadAliases() {
+            const body = document.getElementById('aliasBody');
+            try {
+                const resp = await fetch('/aliases?token=' + token);
+                const data = await resp.json();
+                if (!resp.ok) throw new Error(data.detail || '未知错误');
+                const aliases = data.aliases;
+                document.getElementById('aliasCount').textContent = aliases.length;
+                if (!aliases.length) {
+                    body.innerHTML = '<tr><td colspan="5" class="empty-row">暂无别名数据</td></tr>';
+                    return;
+                }
+                body.innerHTML = aliases.map(a => {
+                    const type = escapeHtml(a.type);
+                    const alias = escapeHtml(a.alias);
+                    return '<tr>' +
+                        '<td><strong>' + alias + '</strong></td>' +
+                        '<td>' + escapeHtml(a.canonical) + '</td>' +
+                        '<td><span class="type-badge type-' + type + '">' + (TYPE_DISPLAY[a.type] || type) + '</span></td>' +
+                        '<td>' + escapeHtml(String(a.created_at).slice(0, 19)) + '</td>' +
+                        '<td><button class="btn btn-danger" data-alias="' + alias + '">&#128465;&#65039; 删除</button></td>' +
+                        '</tr>';
+                }).join('');
+            } catch (err) {
+                body.innerHTML = '<tr><td colspan="5" class="empty-row">加载失败：' + escapeHtml(err.message) + '</td></tr>';
+            }
+        }
         
-        document.getElementById('aliasForm').onsubmit = async function(e) {{
+        document.getElementById('aliasBody').onclick = function(e) {
+            const btn = e.target.closest('button[data-alias]');
+            if (btn) deleteAlias(btn.dataset.alias);
+        };
+        
+        document.getElementById('aliasForm').onsubmit = async function(e) {
             e.preventDefault();
             const alias = document.getElementById('alias').value;
             const canonical = document.getElementById('canonical').value;
             const type = document.getElementById('aliasType').value;
             
-            try {{
-                const resp = await fetch('/aliases?token=' + token, {{
+            try {
+                const resp = await fetch('/aliases?token=' + token, {
                     method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify({{alias, canonical, type}})
-                }});
-                if (resp.ok) {{
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({alias, canonical, type})
+                });
+                if (resp.ok) {
                     alert('&#9989; 添加成功！');
-                    location.reload();
-                }} else {{
+                    this.reset();
+                    loadAliases();
+                } else {
                     const data = await resp.json();
                     alert('&#10060; 添加失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
+                }
+            } catch (err) {
                 alert('&#10060; 添加失败：' + err.message);
-            }}
-        }};
+            }
+        };
         
-        async function deleteAlias(alias) {{
+        async function deleteAlias(alias) {
             if (!confirm('确定要删除这个别名吗？')) return;
-            try {{
-                const resp = await fetch('/aliases/' + encodeURIComponent(alias) + '?token=' + token, {{
+            try {
+                const resp = await fetch('/aliases/' + encodeURIComponent(alias) + '?token=' + token, {
                     method: 'DELETE'
-                }});
-                if (resp.ok) {{
-                    location.reload();
-                }} else {{
+                });
+                if (resp.ok) {
+                    loadAliases();
+                } else {
                     const data = await resp.json();
                     alert('&#10060; 删除失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
+                }
+            } catch (err) {
                 alert('&#10060; 删除失败：' + err.message);
-            }}
-        }}
-    </script>
-</body>
-</html>
-"""
-            return HTMLResponse(content=html)
+            }
+        }
         
-        @app.get("/model-settings-page", response_class=HTMLResponse)
-        async def model_settings_page(request: Request, _=Depends(verify_token)):
-            """Model settings page with embedding and reranking status"""
-            embedding_status = self.config.get('embedding_status', {
-                'enabled': False, 'implemented': False, 'provider_id': None, 'message': '状态未知'
-            })
-            reranking_status = self.config.get('reranking_status', {
-                'enabled': False, 'implemented': False, 'provider_id': None, 'message': '状态未知'
-            })
-            
-            # Determine status display
-            def get_status_display(status):
-                if status.get('implemented'):
-                    return ('&#9989;', '已实现', 'status-implemented')
-                elif status.get('enabled'):
-                    return ('&#9888;&#65039;', '已启用但未实现', 'status-enabled')
-                else:
-                    return ('&#10060;', '未启用', 'status-disabled')
-            
-            emb_icon, emb_text, emb_class = get_status_display(embedding_status)
-            rer_icon, rer_text, rer_class = get_status_display(reranking_status)
-            
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>模型设置 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        .model-card {{
+        loadAliases();
+"""
+
+
+# Default status categories offered on the status mapping page
+_STATUS_OPTIONS = [
+    ('burn', '燃烧 (Burn)'),
+    ('bleed', '流血 (Bleed)'),
+    ('tremor', '震颤 (Tremor)'),
+    ('rupture', '破裂 (Rupture)'),
+    ('sinking', '沉沦 (Sinking)'),
+    ('poise', '蓄力 (Poise)'),
+    ('charge', '充能 (Charge)'),
+    ('other', '其他'),
+]
+_STATUS_OPTIONS_HTML = ''.join([
+    '<option value="' + val + '">' + label + '</option>' for val, label in _STATUS_OPTIONS
+])
+
+
+_MODEL_PAGE_CSS = """
+        .model-card {
             background: rgba(255, 255, 255, 0.05);
             border: 1px solid rgba(255, 255, 255, 0.1);
             padding: 25px;
             margin: 15px 0;
             border-radius: 12px;
-        }}
-        .model-header {{
+        }
+        .model-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 15px;
-        }}
-        .model-title {{
+        }
+        .model-title {
             font-size: 18px;
             font-weight: 600;
             color: #4ecca3;
-        }}
-        .model-status {{
+        }
+        .model-status {
             padding: 6px 16px;
             border-radius: 20px;
             font-weight: 500;
             font-size: 14px;
-        }}
-        .status-implemented {{ background: rgba(78, 204, 163, 0.2); color: #4ecca3; }}
-        .status-enabled {{ background: rgba(255, 193, 7, 0.2); color: #ffc107; }}
-        .status-disabled {{ background: rgba(108, 117, 125, 0.2); color: #6c757d; }}
-        .model-info {{
+        }
+        .status-implemented { background: rgba(78, 204, 163, 0.2); color: #4ecca3; }
+        .status-enabled { background: rgba(255, 193, 7, 0.2); color: #ffc107; }
+        .status-disabled { background: rgba(108, 117, 125, 0.2); color: #6c757d; }
+        .model-info {
             margin-top: 15px;
-        }}
-        .info-item {{
+        }
+        .info-item {
             display: flex;
             padding: 10px 0;
             border-bottom: 1px solid rgba(255, 255, 255, 0.05);
-        }}
-        .info-item:last-child {{ border-bottom: none; }}
-        .info-label {{ width: 120px; color: #a0a0a0; }}
-        .info-value {{ color: #e0e0e0; }}
-        .info-help {{
+        }
+        .info-item:last-child { border-bottom: none; }
+        .info-label { width: 120px; color: #a0a0a0; }
+        .info-value { color: #e0e0e0; }
+        .info-help {
             margin-top: 15px;
             padding: 15px;
             background: rgba(78, 204, 163, 0.1);
@@ -1581,18 +1102,29 @@ class WebUIServer:
             border-radius: 8px;
             font-size: 14px;
             color: #a0a0a0;
-        }}
-        .info-help strong {{ color: #4ecca3; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#9881;&#65039; 模型设置</h1>
-        </div>
-        
-        {_render_nav(self.token, 'model')}
-        
+        }
+        .info-help strong { color: #4ecca3; }
+"""
+
+
+def _model_status_display(status: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(icon, text, css class) describing an embedding/reranking status"""
+    if status.get('implemented'):
+        return ('&#9989;', '已实现', 'status-implemented')
+    elif status.get('enabled'):
+        return ('&#9888;&#65039;', '已启用但未实现', 'status-enabled')
+    else:
+        return ('&#10060;', '未启用', 'status-disabled')
+
+
+def _render_model_page(config: Dict[str, Any]) -> str:
+    """Render the model settings page body; it only depends on the plugin config"""
+    unknown = {'enabled': False, 'implemented': False, 'provider_id': None, 'message': '状态未知'}
+    embedding_status = config.get('embedding_status', unknown)
+    reranking_status = config.get('reranking_status', unknown)
+    emb_icon, emb_text, emb_class = _model_status_display(embedding_status)
+    rer_icon, rer_text, rer_class = _model_status_display(reranking_status)
+    return f"""
         <div class="card">
             <h2>&#128301; 检索增强模型状态</h2>
             <p style="color: #a0a0a0; margin-bottom: 20px;">
@@ -1618,11 +1150,11 @@ class WebUIServer:
                     </div>
                     <div class="info-item">
                         <span class="info-label">提供者ID</span>
-                        <span class="info-value">{embedding_status.get('provider_id') or '未配置'}</span>
+                        <span class="info-value">{_escape(str(embedding_status.get('provider_id') or '未配置'))}</span>
                     </div>
                     <div class="info-item">
                         <span class="info-label">状态信息</span>
-                        <span class="info-value">{embedding_status.get('message') or '-'}</span>
+                        <span class="info-value">{_escape(str(embedding_status.get('message') or '-'))}</span>
                     </div>
                 </div>
                 <div class="info-help">
@@ -1652,11 +1184,11 @@ class WebUIServer:
                     </div>
                     <div class="info-item">
                         <span class="info-label">提供者ID</span>
-                        <span class="info-value">{reranking_status.get('provider_id') or '未配置'}</span>
+                        <span class="info-value">{_escape(str(reranking_status.get('provider_id') or '未配置'))}</span>
                     </div>
                     <div class="info-item">
                         <span class="info-label">状态信息</span>
-                        <span class="info-value">{reranking_status.get('message') or '-'}</span>
+                        <span class="info-value">{_escape(str(reranking_status.get('message') or '-'))}</span>
                     </div>
                 </div>
                 <div class="info-help">
@@ -1673,148 +1205,39 @@ class WebUIServer:
             <div class="model-info">
                 <div class="info-item">
                     <span class="info-label">TopK</span>
-                    <span class="info-value">{self.config.get('top_k', 6)}</span>
+                    <span class="info-value">{config.get('top_k', 6)}</span>
                 </div>
                 <div class="info-item">
                     <span class="info-label">分块大小</span>
-                    <span class="info-value">{self.config.get('chunk_size', 800)} 字符</span>
+                    <span class="info-value">{config.get('chunk_size', 800)} 字符</span>
                 </div>
                 <div class="info-item">
                     <span class="info-label">分块重叠</span>
-                    <span class="info-value">{self.config.get('overlap', 120)} 字符</span>
+                    <span class="info-value">{config.get('overlap', 120)} 字符</span>
                 </div>
                 <div class="info-item">
                     <span class="info-label">群覆盖加权</span>
-                    <span class="info-value">{self.config.get('group_boost', 1.2)}x</span>
+                    <span class="info-value">{config.get('group_boost', 1.2)}x</span>
                 </div>
             </div>
             <div class="info-help">
                 <strong>&#128161; 提示：</strong>这些配置需要在AstrBot管理面板的插件配置中修改，修改后重启插件生效。
             </div>
         </div>
-    </div>
-</body>
-</html>
 """
-            return HTMLResponse(content=html)
-        
-        @app.get("/template-page", response_class=HTMLResponse)
-        async def template_page(request: Request, _=Depends(verify_token)):
-            """Document template management page"""
-            templates = await self.db.get_templates()
-            
-            # Import the default template from prompts module
-            from ..core.prompts import DOCUMENT_TEMPLATE
-            
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>文档模版 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-        th, td {{ padding: 15px; text-align: left; border-bottom: 1px solid rgba(255, 255, 255, 0.1); }}
-        th {{ 
-            background: rgba(233, 69, 96, 0.2); 
-            color: #ff6b6b;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 12px;
-            letter-spacing: 1px;
-        }}
-        tr:hover {{ background: rgba(255, 255, 255, 0.05); }}
-        .btn {{
+
+_TEMPLATE_PAGE_CSS = """
+        .btn {
             padding: 8px 16px;
-            cursor: pointer;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            transition: all 0.3s ease;
             font-size: 13px;
             margin: 2px;
-        }}
-        .btn-sm {{ padding: 6px 12px; font-size: 12px; }}
-        .btn-danger {{
-            background: linear-gradient(90deg, #dc3545, #c82333);
-            color: white;
-        }}
-        .btn-primary {{
-            background: linear-gradient(90deg, #4ecca3, #38b984);
-            color: white;
-        }}
-        .btn-secondary {{
+        }
+        .btn-sm { padding: 6px 12px; font-size: 12px; }
+        .btn-secondary {
             background: rgba(255, 255, 255, 0.1);
             color: #e0e0e0;
-        }}
-        .btn:hover {{ transform: translateY(-2px); }}
-        .form-group {{ margin-bottom: 20px; }}
-        .form-group label {{
-            display: block;
-            margin-bottom: 8px;
-            color: #a0a0a0;
-            font-weight: 500;
-        }}
-        input[type="text"], textarea {{
+        }
+        input[type="text"], textarea {
             width: 100%;
             padding: 12px 16px;
             border: 2px solid rgba(255, 255, 255, 0.1);
@@ -1823,24 +1246,23 @@ class WebUIServer:
             color: #e0e0e0;
             font-size: 14px;
             transition: border-color 0.3s ease;
-        }}
-        input:focus, textarea:focus {{ outline: none; border-color: #4ecca3; }}
-        textarea {{
+        }
+        input:focus, textarea:focus { outline: none; border-color: #4ecca3; }
+        textarea {
             min-height: 400px;
             font-family: 'Consolas', 'Monaco', monospace;
             line-height: 1.6;
             resize: vertical;
-        }}
-        .empty-row {{ color: #666; font-style: italic; text-align: center; }}
-        .badge {{
+        }
+        .badge {
             display: inline-block;
             padding: 3px 8px;
             border-radius: 10px;
             font-size: 11px;
             font-weight: 500;
-        }}
-        .badge-default {{ background: rgba(78, 204, 163, 0.2); color: #4ecca3; }}
-        .template-content {{
+        }
+        .badge-default { background: rgba(78, 204, 163, 0.2); color: #4ecca3; }
+        .template-content {
             background: rgba(0, 0, 0, 0.3);
             padding: 20px;
             border-radius: 8px;
@@ -1851,13 +1273,13 @@ class WebUIServer:
             font-size: 13px;
             line-height: 1.6;
             color: #c0c0c0;
-        }}
-        .tab-buttons {{
+        }
+        .tab-buttons {
             display: flex;
             gap: 10px;
             margin-bottom: 20px;
-        }}
-        .tab-btn {{
+        }
+        .tab-btn {
             padding: 10px 20px;
             background: rgba(255, 255, 255, 0.1);
             border: none;
@@ -1865,31 +1287,26 @@ class WebUIServer:
             color: #e0e0e0;
             cursor: pointer;
             transition: all 0.3s ease;
-        }}
-        .tab-btn.active {{
+        }
+        .tab-btn.active {
             background: linear-gradient(90deg, #4ecca3, #38b984);
             color: white;
-        }}
-        .tab-content {{ display: none; }}
-        .tab-content.active {{ display: block; }}
-        #templateEditor {{ display: none; }}
-        #templateEditor.active {{ display: block; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#128203; 文档模版（中文版）</h1>
-        </div>
-        
-        {_render_nav(self.token, 'template')}
-        
+        }
+        .tab-content { display: none; }
+        .tab-content.active { display: block; }
+        #templateEditor { display: none; }
+        #templateEditor.active { display: block; }
+"""
+
+
+# Static part of the template page; %s is the (escaped) built-in template
+_TEMPLATE_PAGE_HTML = """
         <div class="card">
             <h2>&#128196; 默认中文模板</h2>
             <p style="color: #a0a0a0; margin-bottom: 15px;">
                 这是系统内置的默认中文攻略文档模板，可以直接复制使用，或基于此创建自定义模板。
             </p>
-            <div class="template-content">{DOCUMENT_TEMPLATE}</div>
+            <div class="template-content">%s</div>
             <div style="margin-top: 15px;">
                 <button class="btn btn-primary" onclick="copyDefaultTemplate()">&#128203; 复制模板</button>
                 <button class="btn btn-secondary" onclick="showCreateForm()">&#10133; 基于此创建自定义模板</button>
@@ -1916,408 +1333,1121 @@ class WebUIServer:
             </form>
         </div>
         
-        <div class="card">
-            <h2>&#128203; 自定义模板列表（共 {len(templates)} 个）</h2>
-            <table>
-                <tr><th>名称</th><th>描述</th><th>大小</th><th>更新时间</th><th>操作</th></tr>
-                {_render_template_rows(templates)}
-            </table>
-        </div>
-    </div>
-    
-    <script>
-        const token = '{self.token}';
-        const defaultTemplate = {json.dumps(DOCUMENT_TEMPLATE)};
-        let editingTemplate = null;
+"""
+_TEMPLATE_LIST_TPL = """        <div class="card">
+            <h2>&#128203; 自定义模板列表（共 %d 个）</h2>
+            <table id="templateTable">
+                <tr><th>名称</th><th>描述</th><th>大小</th><th>更新时间</th><th>操作</th></tr>
+                %s
+            </table>
+        </div>
+"""
+
+
+_TEMPLATE_PAGE_JS = """
+        let editingTemplate = null;
+        
+        function copyDefaultTemplate() {
+            navigator.clipboard.writeText(defaultTemplate).then(() => {
+                alert('&#9989; 模板已复制到剪贴板！');
+            }).catch(err => {
+                alert('&#10060; 复制失败，请手动选择复制');
+            });
+        }
+        
+        function showCreateForm() {
+            document.getElementById('templateEditor').classList.add('active');
+            document.getElementById('editorTitle').textContent = '&#10133; 创建自定义模板';
+            document.getElementById('templateName').value = '';
+            document.getElementById('templateDesc').value = '';
+            document.getElementById('templateContent').value = defaultTemplate;
+            editingTemplate = null;
+        }
+        
+        function hideEditor() {
+            document.getElementById('templateEditor').classList.remove('active');
+            editingTemplate = null;
+        }
+        
+        async function editTemplate(name) {
+            try {
+                const resp = await fetch('/templates/' + encodeURIComponent(name) + '?token=' + encodeURIComponent(token));
+                if (!resp.ok) {
+                    const data = await resp.json();
+                    alert('&#10060; 加载模板失败：' + (data.detail || '未知错误'));
+                    return;
+                }
+                const data = await resp.json();
+                if (data.template) {
+                    document.getElementById('templateEditor').classList.add('active');
+                    document.getElementById('editorTitle').textContent = '&#9998; 编辑模板';
+                    document.getElementById('templateName').value = data.template.name;
+                    document.getElementById('templateDesc').value = data.template.description || '';
+                    document.getElementById('templateContent').value = data.template.content;
+                    editingTemplate = name;
+                } else {
+                    alert('&#10060; 模板数据为空');
+                }
+            } catch (err) {
+                alert('&#10060; 加载模板失败：' + err.message);
+            }
+        }
+        
+        document.getElementById('templateForm').onsubmit = async function(e) {
+            e.preventDefault();
+            const name = document.getElementById('templateName').value;
+            const description = document.getElementById('templateDesc').value;
+            const content = document.getElementById('templateContent').value;
+            
+            try {
+                const resp = await fetch('/templates?token=' + encodeURIComponent(token), {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({name, content, description})
+                });
+                if (resp.ok) {
+                    alert('&#9989; 模板保存成功！');
+                    location.reload();
+                } else {
+                    const data = await resp.json();
+                    alert('&#10060; 保存失败：' + (data.detail || '未知错误'));
+                }
+            } catch (err) {
+                alert('&#10060; 保存失败：' + err.message);
+            }
+        };
+        
+        document.getElementById('templateTable').onclick = function(e) {
+            const btn = e.target.closest('button[data-edit], button[data-delete]');
+            if (!btn) return;
+            if (btn.dataset.edit !== undefined) editTemplate(btn.dataset.edit);
+            else deleteTemplate(btn.dataset.delete);
+        };
+        
+        async function deleteTemplate(name) {
+            if (!confirm('确定要删除模板 "' + name + '" 吗？')) return;
+            try {
+                const resp = await fetch('/templates/' + encodeURIComponent(name) + '?token=' + encodeURIComponent(token), {
+                    method: 'DELETE'
+                });
+                if (resp.ok) {
+                    location.reload();
+                } else {
+                    const data = await resp.json();
+                    alert('&#10060; 删除失败：' + (data.detail || '未知错误'));
+                }
+            } catch (err) {
+                alert('&#10060; 删除失败：' + err.message);
+            }
+        }
+"""
+
+_MAPPING_PAGE_CSS = """
+        .btn {
+            padding: 10px 20px;
+            font-size: 14px;
+        }
+        input[type="text"], select {
+            width: 100%;
+            max-width: 400px;
+            padding: 12px 16px;
+            border: 2px solid rgba(255, 255, 255, 0.1);
+            border-radius: 8px;
+            background: rgba(255, 255, 255, 0.05);
+            color: #e0e0e0;
+            font-size: 14px;
+            transition: border-color 0.3s ease;
+        }
+        .info-box {
+            background: rgba(78, 204, 163, 0.1);
+            border-left: 4px solid #4ecca3;
+            padding: 15px 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+            font-size: 14px;
+            color: #a0a0a0;
+        }
+        .info-box strong { color: #4ecca3; }
+        .example-box {
+            background: rgba(255, 193, 7, 0.1);
+            border-left: 4px solid #ffc107;
+            padding: 15px 20px;
+            border-radius: 8px;
+            margin: 15px 0;
+            font-size: 14px;
+            color: #a0a0a0;
+        }
+        .example-box strong { color: #ffc107; }
+"""
+
+
+# Static part of the status mapping page
+_MAPPING_PAGE_HTML = """
+        <div class="card">
+            <h2>&#9881;&#65039; 功能说明</h2>
+            <div class="info-box">
+                <strong>&#128161; 什么是状态映射？</strong><br>
+                状态映射允许你为游戏中的状态效果定义自定义子类别和显示名称。
+                这在检索时可以帮助更精确地匹配用户的查询意图。
+            </div>
+            <div class="example-box">
+                <strong>&#128221; 使用示例：</strong><br>
+                • 状态：<strong>破裂 (rupture)</strong> → 子类别：<strong>被动破裂</strong> → 显示名称：<strong>非破裂但有破裂效果</strong><br>
+                • 状态：<strong>燃烧 (burn)</strong> → 子类别：<strong>燃烧叠层</strong> → 显示名称：<strong>高叠层燃烧流派</strong><br>
+                • 状态：<strong>震颤 (tremor)</strong> → 子类别：<strong>震颤爆发</strong> → 显示名称：<strong>震颤计数触发伤害</strong>
+            </div>
+        </div>
+        
+        <div class="card">
+            <h2>&#10133; 添加状态映射</h2>
+            <form id="mappingForm">
+                <div class="form-group">
+                    <label>主状态类别</label>
+                    <select id="statusName" required>
+""" + _STATUS_OPTIONS_HTML + """
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label>子类别名称</label>
+                    <input type="text" id="subcategory" placeholder="例如：被动破裂、高叠层燃烧" required>
+                </div>
+                <div class="form-group">
+                    <label>显示名称</label>
+                    <input type="text" id="displayName" placeholder="例如：非破裂但有破裂效果" required>
+                </div>
+                <div class="form-group">
+                    <label>描述（可选）</label>
+                    <input type="text" id="mappingDesc" placeholder="简短描述这个子类别的特点">
+                </div>
+                <button type="submit" class="btn btn-primary">&#10133; 添加映射</button>
+            </form>
+        </div>
+        
+"""
+_MAPPING_LIST_TPL = """        <div class="card">
+            <h2>&#128203; 映射列表（共 %d 条）</h2>
+            <table>
+                <tr><th>主状态</th><th>子类别</th><th>显示名称</th><th>描述</th><th>操作</th></tr>
+                %s
+            </table>
+        </div>
+"""
+
+
+_MAPPING_PAGE_JS = """
+        document.getElementById('mappingForm').onsubmit = async function(e) {
+            e.preventDefault();
+            const status_name = document.getElementById('statusName').value;
+            const subcategory = document.getElementById('subcategory').value;
+            const display_name = document.getElementById('displayName').value;
+            const description = document.getElementById('mappingDesc').value;
+            
+            try {
+                const resp = await fetch('/status-mappings?token=' + token, {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({status_name, subcategory, display_name, description})
+                });
+                if (resp.ok) {
+                    alert('&#9989; 映射添加成功！');
+                    location.reload();
+                } else {
+                    const data = await resp.json();
+                    alert('&#10060; 添加失败：' + (data.detail || '未知错误'));
+                }
+            } catch (err) {
+                alert('&#10060; 添加失败：' + err.message);
+            }
+        };
+        
+        async function deleteMapping(id) {
+            if (!confirm('确定要删除这个映射吗？')) return;
+            try {
+                const resp = await fetch('/status-mappings/' + id + '?token=' + token, {
+                    method: 'DELETE'
+                });
+                if (resp.ok) {
+                    location.reload();
+                } else {
+                    const data = await resp.json();
+                    alert('&#10060; 删除失败：' + (data.detail || '未知错误'));
+                }
+            } catch (err) {
+                alert('&#10060; 删除失败：' + err.message);
+            }
+        }
+"""
+
+
+class _StaticAsset:
+    """Pre-encoded static asset with a content hash for ETag and cache busting"""
+    
+    def __init__(self, name: str, content: str, media_type: str):
+        self.body = content.encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, 9)
+        self.media_type = media_type
+        self.etag = '"' + hashlib.md5(self.body).hexdigest() + '"'
+        self.url = '/static/' + name + '?v=' + self.etag[1:9]
+
+
+_STATIC_ASSETS = {
+    'app.css': _StaticAsset('app.css', _BASE_CSS, 'text/css; charset=utf-8'),
+    'docs.js': _StaticAsset('docs.js', _DOCS_PAGE_JS, 'application/javascript; charset=utf-8'),
+    'aliases.js': _StaticAsset('aliases.js', _ALIASES_PAGE_JS, 'application/javascript; charset=utf-8'),
+    'template.js': _StaticAsset('template.js', _TEMPLATE_PAGE_JS, 'application/javascript; charset=utf-8'),
+    'mapping.js': _StaticAsset('mapping.js', _MAPPING_PAGE_JS, 'application/javascript; charset=utf-8'),
+}
+
+# Asset URLs carry a content hash, so browsers may cache them aggressively
+_STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# Browsers that opened a ?token= link get the token as a cookie, so later
+# requests authenticate without it (values outside this alphabet would
+# need quoting, so such tokens simply keep using the query string)
+_TOKEN_COOKIE = 'limbus_webui_token'
+_TOKEN_COOKIE_MAX_AGE = 86400
+_COOKIE_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + '-_.~')
+
+# Every HTML page embeds the access token (nav links and page scripts), so
+# pages stay out of shared caches; no-cache makes the browser revalidate each
+# use, which is what lets the pages' ETags answer with 304
+_PAGE_CACHE_CONTROL = 'private, no-cache'
+
+
+def _page_cache_headers(etag: str) -> Dict[str, str]:
+    """Headers for token-bearing pages that still answer If-None-Match"""
+    return {'ETag': etag, 'Cache-Control': _PAGE_CACHE_CONTROL}
+
+
+# JSON replies that carry an ETag must be storable, or fetch() never sends
+# If-None-Match; no-cache still makes every use revalidate first
+_API_CACHE_CONTROL = 'private, no-cache'
+
+
+def _api_cache_headers(etag: str) -> Dict[str, str]:
+    """Headers for GET API replies that answer If-None-Match"""
+    return {'ETag': etag, 'Cache-Control': _API_CACHE_CONTROL}
+
+
+async def _render_rows_async(render: Callable[..., str], rows: List[Dict[str, Any]], *args) -> str:
+    """Render table rows, in a worker thread once the list is large enough
+    that building the HTML would noticeably stall the event loop."""
+    if len(rows) > _RENDER_OFFLOAD_THRESHOLD:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, render, rows, *args)
+    return render(rows, *args)
+
+
+def _render_page_head(title: str, heading: str, nav: str, page_css: str = '') -> str:
+    """Render the page start: shared head, CSS link, header and nav."""
+    return ''.join([
+        '<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n    <title>', title, '</title>\n'
+        '    <meta charset="utf-8">\n'
+        '    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        '    <link rel="stylesheet" href="', _STATIC_ASSETS['app.css'].url, '">\n'
+        '    <style>', page_css, '    </style>\n</head>\n<body>\n'
+        '    <div class="container">\n'
+        '        <div class="header">\n            <h1>', heading, '</h1>\n        </div>\n'
+        '        \n        ', nav, '\n',
+    ])
+
+
+def _render_page_foot(script: str = '', script_asset: str = '') -> str:
+    """Render the page end: container close plus optional scripts."""
+    parts = ['\n    </div>\n']
+    if script:
+        parts.extend(['    \n    <script>\n', script, '\n    </script>\n'])
+    if script_asset:
+        parts.extend(['    <script src="', _STATIC_ASSETS[script_asset].url, '"></script>\n'])
+    parts.append('</body>\n</html>\n')
+    return ''.join(parts)
+
+
+def _render_page_shell(token: str, active: str, title: str, heading: str,
+                       page_css: str = '', script: str = '',
+                       script_asset: str = '') -> Tuple[bytes, bytes]:
+    """Render and encode the (head, foot) of a page; content goes in between."""
+    head = _render_page_head(title, heading, _render_nav(token, active), page_css)
+    return head.encode('utf-8'), _render_page_foot(script, script_asset).encode('utf-8')
+
+
+def _decode_upload(content: bytes) -> Optional[str]:
+    """Decode an uploaded text file, or return None if no encoding fits"""
+    # A UTF-16 BOM is unambiguous; otherwise try strict UTF-8 (BOM optional)
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = 'utf-16'
+    else:
+        encoding = 'utf-8-sig'
+    try:
+        return content.decode(encoding)
+    except UnicodeDecodeError:
+        pass
+    # Almost any double-byte legacy text (Big5, Shift-JIS, EUC-KR...) is
+    # valid GB18030, so let charset detection pick the encoding first
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        from_bytes = None
+    if from_bytes is not None:
+        best = from_bytes(content).best()
+        if best is not None:
+            return str(best)
+    # Last resort: GB18030 (a superset of GBK) covers most Chinese guide files
+    try:
+        return content.decode('gb18030')
+    except UnicodeDecodeError:
+        return None
+
+
+def _read_upload_text(fileobj) -> Optional[str]:
+    """Incrementally decode an uploaded file as UTF-8, falling back to _decode_upload"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    parts = []
+    try:
+        while True:
+            block = fileobj.read(_UPLOAD_READ_SIZE)
+            if not block:
+                break
+            parts.append(decoder.decode(block))
+        parts.append(decoder.decode(b'', final=True))
+    except UnicodeDecodeError:
+        # Not UTF-8: rewind and let the other encodings have a go
+        fileobj.seek(0)
+        return _decode_upload(fileobj.read())
+    return ''.join(parts)
+
+
+def _chunk_and_tag(chunker, tagger, text: str, name: str) -> List[Dict]:
+    """Split an uploaded document into tagged chunks (runs in a worker thread)"""
+    return tagger.process_chunks(chunker.process_document(text, name))
+
+
+def _search_json(searcher, query: str, top_k: int, group_id: Optional[str],
+                 debug: bool) -> bytes:
+    """Run a search and serialize the reply (runs in a worker thread)
+    
+    Query analysis and index statistics are only included in debug replies.
+    """
+    if debug:
+        return _dump_json(searcher.search_with_debug(query=query, top_k=top_k, group_id=group_id))
+    return _dump_json({'results': searcher.search(query, top_k, group_id)})
+
+
+def _bind_listen_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Bind the WebUI listening socket up front so uvicorn can adopt it
+
+    Raises OSError with errno EADDRINUSE when the port is already taken.
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    # A bindable port can still be served by another listener (e.g. on a
+    # different address family or via SO_REUSEPORT); make sure nobody
+    # answers on the loopback address before claiming it
+    probe_host = {'0.0.0.0': '127.0.0.1', '::': '::1'}.get(host, host)
+    try:
+        probe = socket.create_connection((probe_host, port), timeout=0.05)
+    except (OSError, OverflowError):
+        pass
+    else:
+        probe.close()
+        raise OSError(errno.EADDRINUSE, os.strerror(errno.EADDRINUSE))
+    
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        # Match uvicorn's own bind so sockets lingering in TIME_WAIT after a
+        # restart don't count as "in use" (on Windows this flag would allow
+        # stealing a live port, so it is POSIX-only)
+        if os.name != 'nt':
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+        sock.setblocking(False)
+    except (OSError, OverflowError):
+        sock.close()
+        raise
+    return sock
+
+
+def _dump_json(data: Any) -> bytes:
+    """Serialize an API reply once, so cached replies skip encoding entirely"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _uvicorn_http_impl() -> str:
+    """Pick the C-accelerated httptools parser when installed, else pure-Python h11"""
+    try:
+        import httptools  # noqa: F401
+        return 'httptools'
+    except ImportError:
+        return 'h11'
+
+
+# Seconds the status page may reuse cached knowledge base statistics. Writes
+# through this connection invalidate the snapshot anyway (mutation counter)
+# and it is re-warmed after each index rebuild, so this only bounds staleness
+# from changes made outside the plugin
+_STATS_CACHE_TTL = 60.0
+
+# Seconds a polled JSON API reply (/stats, /aliases) is served from cache,
+# and how many distinct replies (e.g. per group_id) are kept at most
+_API_CACHE_TTL = 2.0
+_API_CACHE_MAX_ENTRIES = 64
+
+# Seconds a /search reply is reused for a repeated query, and how many
+# distinct queries are kept (least recently used are dropped first). Index
+# rebuilds and alias changes discard the whole cache
+_SEARCH_CACHE_TTL = 300.0
+_SEARCH_CACHE_MAX_ENTRIES = 1024
+
+# Row count above which table HTML is rendered off the event loop
+_RENDER_OFFLOAD_THRESHOLD = 50
+
+# Maximum number of chunks listed on the chunk browsing page
+_CHUNKS_PAGE_LIMIT = 100
+
+# Seconds to wait for uvicorn to report it is serving, and how often to check
+_SERVER_STARTUP_TIMEOUT = 2.0
+_SERVER_STARTUP_POLL_INTERVAL = 0.01
+
+# Block size used when decoding uploaded files
+_UPLOAD_READ_SIZE = 64 * 1024
+
+# Seconds to wait for further changes before rebuilding the search index
+_INDEX_UPDATE_DEBOUNCE = 0.5
+
+# Listen backlog, idle keep-alive timeout (seconds) and the number of
+# connections/tasks served at once before uvicorn answers 503
+_SERVER_BACKLOG = 2048
+_SERVER_KEEP_ALIVE_TIMEOUT = 15
+_SERVER_LIMIT_CONCURRENCY = 128
+
+
+class WebUIServer:
+    """FastAPI-based WebUI server for knowledge base management"""
+    
+    def __init__(self, 
+                 db,  # Database instance
+                 chunker,  # Chunker instance
+                 tagger,  # Tagger instance
+                 searcher,  # Searcher instance
+                 config: dict,
+                 on_index_update: Optional[Callable[[], Awaitable[None]]] = None):
+        """
+        Initialize WebUI server
+        
+        Args:
+            db: Database instance
+            chunker: Chunker instance
+            tagger: Tagger instance
+            searcher: Searcher instance
+            config: Configuration dict with webui settings
+            on_index_update: Callback to rebuild search index after data changes
+        """
+        self.db = db
+        self.chunker = chunker
+        self.tagger = tagger
+        self.searcher = searcher
+        self.config = config
+        self.on_index_update = on_index_update
+        
+        self.host = config.get('webui_host', '0.0.0.0')
+        self.port = config.get('webui_port', 8765)
+        # The token is only generated when something asks for it, so a
+        # disabled WebUI never touches the system RNG
+        self._token: Optional[str] = config.get('webui_token') or None
+        self._token_digest: Optional[bytes] = None
+        self.enabled = config.get('webui_enabled', True)
+        self.debug = config.get('webui_debug', False)
+        
+        self.app = None
+        self.server = None
+        self._server_task = None
+        
+        # Status page snapshot: (expires_at, db_version, stats, group_ids)
+        self._stats_cache: Optional[tuple] = None
+        self._stats_lock = asyncio.Lock()
+        
+        # Serialized API replies: key -> (expires_at, db_version, body)
+        self._api_cache: Dict[tuple, tuple] = {}
+        
+        # Serialized /search replies keyed by (query, top_k, group_id, debug)
+        # -> (expires_at, body), plus a generation bumped whenever the index
+        # or aliases change
+        self._search_cache: OrderedDict = OrderedDict()
+        self._search_generation = 0
+        
+        # Rendered table sections of the docs/template/mapping pages:
+        # page -> (db_version, html bytes)
+        self._table_cache: Dict[str, tuple] = {}
+        
+        # Set per start() so ETags from a previous run never match
+        self._etag_seed = ''
+        
+        # Debounced search index rebuild (see _on_data_changed)
+        self._index_update_task: Optional[asyncio.Task] = None
+        self._index_dirty = False
+    
+    def _generate_token(self) -> str:
+        """Generate a secure random token"""
+        return secrets.token_urlsafe(32)
+    
+    @property
+    def token(self) -> str:
+        """Authentication token, generated on first use unless configured"""
+        if self._token is None:
+            self._token = self._generate_token()
+        return self._token
+    
+    @staticmethod
+    def _digest(value: str) -> bytes:
+        """Hash a token so comparisons run over fixed-length digests"""
+        return hashlib.sha256(value.encode('utf-8')).digest()
+    
+    def _token_matches(self, candidate: Optional[str]) -> bool:
+        """Constant-time check of a presented token against the configured one"""
+        if not candidate:
+            return False
+        if self._token_digest is None:
+            self._token_digest = self._digest(self.token)
+        return hmac.compare_digest(self._digest(candidate), self._token_digest)
+    
+    def get_token(self) -> str:
+        """Get the current authentication token"""
+        return self.token
+    
+    def get_url(self) -> str:
+        """Get the WebUI URL"""
+        return f"http://{self.host}:{self.port}"
+    
+    def invalidate_cache(self):
+        """Drop cached statistics after the knowledge base changed"""
+        self._stats_cache = None
+        self._api_cache.clear()
+        self._table_cache.clear()
+        self.invalidate_search_cache()
+    
+    def invalidate_search_cache(self):
+        """Drop cached search replies after the index or aliases changed"""
+        self._search_generation += 1
+        self._search_cache.clear()
+    
+    def _is_fresh(self, cached: Optional[tuple], now: float) -> bool:
+        """Whether a status snapshot is within its TTL and the data is unchanged"""
+        return bool(cached) and cached[0] > now and cached[1] == self.db.mutation_counter
+    
+    async def _get_status_snapshot(self):
+        """Return (stats, group_ids) for the status page, cached for a few seconds"""
+        loop = asyncio.get_running_loop()
+        cached = self._stats_cache
+        if self._is_fresh(cached, loop.time()):
+            return cached[2], cached[3]
+        
+        # Only one coroutine refreshes; concurrent requests wait for its result
+        async with self._stats_lock:
+            cached = self._stats_cache
+            if self._is_fresh(cached, loop.time()):
+                return cached[2], cached[3]
+            
+            version = self.db.mutation_counter
+            stats, group_ids = await asyncio.gather(
+                self.db.get_stats(), self.db.get_all_group_ids()
+            )
+            self._stats_cache = (loop.time() + _STATS_CACHE_TTL, version, stats, group_ids)
+            return stats, group_ids
+    
+    async def _cached_json(self, key: tuple, load: Callable[[], Awaitable[Any]]) -> bytes:
+        """Return the serialized reply for key, reloading it when stale"""
+        now = asyncio.get_running_loop().time()
+        cached = self._api_cache.get(key)
+        if self._is_fresh(cached, now):
+            return cached[2]
+        version = self.db.mutation_counter
+        body = _dump_json(await load())
+        if len(self._api_cache) >= _API_CACHE_MAX_ENTRIES:
+            self._api_cache.clear()
+        self._api_cache[key] = (now + _API_CACHE_TTL, version, body)
+        return body
+    
+    async def _cached_search(self, query: str, top_k: int, group_id: Optional[str],
+                             debug: bool = False) -> bytes:
+        """Return the serialized /search reply, reusing it for repeated queries"""
+        key = (query, top_k, group_id, debug)
+        now = asyncio.get_running_loop().time()
+        cached = self._search_cache.get(key)
+        if cached and cached[0] > now:
+            self._search_cache.move_to_end(key)
+            return cached[1]
+        generation = self._search_generation
+        # Scoring and serializing are CPU-bound; keep them off the event loop
+        body = await asyncio.get_running_loop().run_in_executor(
+            None, _search_json, self.searcher, query, top_k, group_id, debug
+        )
+        # A reply computed while the index changed underneath is not kept
+        if generation == self._search_generation:
+            self._search_cache[key] = (now + _SEARCH_CACHE_TTL, body)
+            self._search_cache.move_to_end(key)
+            if len(self._search_cache) > _SEARCH_CACHE_MAX_ENTRIES:
+                self._search_cache.popitem(last=False)
+        return body
+    
+    async def _cached_table(self, page: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Return a page's rendered tables, re-rendering only after a data change"""
+        # Taken before querying: a write landing meanwhile forces a re-render
+        version = self.db.mutation_counter
+        cached = self._table_cache.get(page)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        html = await render()
+        self._table_cache[page] = (version, html)
+        return html
+    
+    def _page_etag(self, *extra) -> str:
+        """Weak ETag for pages and replies rendered purely from the database"""
+        parts = [self._etag_seed, str(self.db.mutation_counter)]
+        parts.extend(str(value) for value in extra)
+        return 'W/"%s"' % '-'.join(parts)
+    
+    async def _on_data_changed(self):
+        """Invalidate caches and schedule a search index rebuild after a data change"""
+        self.invalidate_cache()
+        if not self.on_index_update:
+            await self._warm_status_snapshot()
+            return
+        # A burst of uploads/deletes collapses into one rebuild; a change that
+        # arrives while a rebuild is running triggers exactly one more
+        self._index_dirty = True
+        if not self.index_updating:
+            self._index_update_task = asyncio.create_task(self._run_index_updates())
+    
+    @property
+    def index_updating(self) -> bool:
+        """Whether a search index rebuild is pending or running"""
+        return self._index_update_task is not None and not self._index_update_task.done()
+    
+    async def _run_index_updates(self):
+        """Rebuild the search index until no further changes are pending"""
+        while self._index_dirty:
+            await asyncio.sleep(_INDEX_UPDATE_DEBOUNCE)
+            self._index_dirty = False
+            try:
+                await self.on_index_update()
+            except Exception:
+                logger.exception("WebUI search index rebuild failed")
+            self.invalidate_search_cache()
+            if not self._index_dirty:
+                # Checked again by the loop: a change that lands while the
+                # snapshot is warmed still gets its rebuild
+                await self._warm_status_snapshot()
+    
+    async def _warm_status_snapshot(self):
+        """Refresh the status page snapshot ahead of the next page view"""
+        try:
+            await self._get_status_snapshot()
+        except Exception:
+            logger.exception("WebUI status snapshot refresh failed")
+    
+    async def start(self):
+        """Start the WebUI server
+        
+        Raises:
+            RuntimeError: If the port is not available or server fails to start
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, File, UploadFile, Form
+            from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+            from fastapi.middleware.gzip import GZipMiddleware
+            from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+            from pydantic import BaseModel
+            import uvicorn
+        except ImportError:
+            # FastAPI not available, skip WebUI
+            raise RuntimeError(
+                "WebUI 依赖未安装。请运行: pip install fastapi 'uvicorn[standard]' python-multipart orjson charset-normalizer"
+            )
+        
+        if orjson is not None:
+            from fastapi.responses import ORJSONResponse as DefaultResponse
+        else:
+            DefaultResponse = JSONResponse
+        
+        self._etag_seed = secrets.token_hex(4)
+        
+        # OpenAPI/Swagger routes are only built in debug mode, and never at the
+        # default /docs path, which would shadow the document list API below
+        app = FastAPI(
+            title="Limbus Guide WebUI",
+            version="1.0.0",
+            default_response_class=DefaultResponse,
+            openapi_url="/openapi.json" if self.debug else None,
+            docs_url="/api-docs" if self.debug else None,
+            redoc_url=None
+        )
+        
+        class PageGZipMiddleware(GZipMiddleware):
+            """Compress pages and API replies; static assets ship pre-compressed"""
+            
+            async def __call__(self, scope, receive, send):
+                if scope['type'] == 'http' and scope['path'].startswith('/static/'):
+                    await self.app(scope, receive, send)
+                    return
+                await super().__call__(scope, receive, send)
+        
+        app.add_middleware(PageGZipMiddleware, minimum_size=1024, compresslevel=5)
+        
+        token_cookie = None
+        if set(self.token) <= _COOKIE_SAFE_CHARS:
+            token_cookie = (
+                '%s=%s; Max-Age=%d; Path=/; HttpOnly; SameSite=Strict'
+                % (_TOKEN_COOKIE, self.token, _TOKEN_COOKIE_MAX_AGE)
+            ).encode('latin-1')
+        
+        class TokenCookieMiddleware:
+            """Set the auth cookie on replies to requests authenticated via ?token="""
+            
+            def __init__(self, app):
+                self.app = app
+            
+            async def __call__(self, scope, receive, send):
+                if scope['type'] != 'http':
+                    await self.app(scope, receive, send)
+                    return
+                
+                async def send_with_cookie(message):
+                    if (message['type'] == 'http.response.start'
+                            and scope.get('state', {}).get('issue_token_cookie')):
+                        message['headers'] = list(message.get('headers', [])) + [
+                            (b'set-cookie', token_cookie)
+                        ]
+                    await send(message)
+                
+                await self.app(scope, receive, send_with_cookie)
+        
+        if token_cookie is not None:
+            app.add_middleware(TokenCookieMiddleware)
+        
+        security = HTTPBearer(auto_error=False)
+        
+        # Token verification
+        async def verify_token(
+            request: Request,
+            response: Response,
+            credentials: HTTPAuthorizationCredentials = Depends(security)
+        ):
+            # A bearer header takes precedence, then the cookie; the query
+            # string is only parsed for bookmarked ?token= links
+            if credentials:
+                authorized = self._token_matches(credentials.credentials)
+            elif self._token_matches(request.cookies.get(_TOKEN_COOKIE)):
+                authorized = True
+            else:
+                authorized = self._token_matches(request.query_params.get('token'))
+                if authorized and token_cookie is not None:
+                    request.state.issue_token_cookie = True
+            if authorized:
+                # Applies to API replies returned as plain data; pages build
+                # their own responses and set _PAGE_CACHE_CONTROL themselves
+                response.headers['Cache-Control'] = 'no-store'
+                return True
+            raise HTTPException(status_code=401, detail="Invalid or missing token")
+        
+        # Request models reject unknown fields and are immutable once parsed
+        try:
+            from pydantic import ConfigDict
+            
+            class RequestModel(BaseModel):
+                model_config = ConfigDict(extra='forbid', frozen=True)
+        except ImportError:
+            # Pydantic 1.x
+            class RequestModel(BaseModel):
+                class Config:
+                    extra = 'forbid'
+                    allow_mutation = False
+        
+        class SearchRequest(RequestModel):
+            query: str
+            group_id: Optional[str] = None
+            top_k: int = 6
+        
+        class AliasRequest(RequestModel):
+            alias: str
+            canonical: str
+            type: str = 'other'
         
-        function copyDefaultTemplate() {{
-            navigator.clipboard.writeText(defaultTemplate).then(() => {{
-                alert('&#9989; 模板已复制到剪贴板！');
-            }}).catch(err => {{
-                alert('&#10060; 复制失败，请手动选择复制');
-            }});
-        }}
+        class BatchDeleteRequest(RequestModel):
+            doc_ids: List[int]
         
-        function showCreateForm() {{
-            document.getElementById('templateEditor').classList.add('active');
-            document.getElementById('editorTitle').textContent = '&#10133; 创建自定义模板';
-            document.getElementById('templateName').value = '';
-            document.getElementById('templateDesc').value = '';
-            document.getElementById('templateContent').value = defaultTemplate;
-            editingTemplate = null;
-        }}
+        # Every route except the static assets requires the token
+        router = APIRouter(dependencies=[Depends(verify_token)])
         
-        function hideEditor() {{
-            document.getElementById('templateEditor').classList.remove('active');
-            editingTemplate = null;
-        }}
+        # ============ Static Assets ============
         
-        async function editTemplate(name) {{
-            try {{
-                const resp = await fetch('/templates/' + encodeURIComponent(name) + '?token=' + encodeURIComponent(token));
-                if (!resp.ok) {{
-                    const data = await resp.json();
-                    alert('&#10060; 加载模板失败：' + (data.detail || '未知错误'));
-                    return;
-                }}
-                const data = await resp.json();
-                if (data.template) {{
-                    document.getElementById('templateEditor').classList.add('active');
-                    document.getElementById('editorTitle').textContent = '&#9998; 编辑模板';
-                    document.getElementById('templateName').value = data.template.name;
-                    document.getElementById('templateDesc').value = data.template.description || '';
-                    document.getElementById('templateContent').value = data.template.content;
-                    editingTemplate = name;
-                }} else {{
-                    alert('&#10060; 模板数据为空');
-                }}
-            }} catch (err) {{
-                alert('&#10060; 加载模板失败：' + err.message);
-            }}
-        }}
+        @app.get("/static/{name}")
+        async def static_asset(name: str, request: Request):
+            """Serve shared CSS/JS; not token-protected since it holds no data"""
+            asset = _STATIC_ASSETS.get(name)
+            if asset is None:
+                raise HTTPException(status_code=404, detail="资源不存在")
+            headers = {
+                'ETag': asset.etag,
+                'Cache-Control': _STATIC_CACHE_CONTROL,
+                'Vary': 'Accept-Encoding'
+            }
+            if request.headers.get('if-none-match') == asset.etag:
+                return Response(status_code=304, headers=headers)
+            if 'gzip' in request.headers.get('accept-encoding', ''):
+                headers['Content-Encoding'] = 'gzip'
+                return Response(content=asset.gzip_body, media_type=asset.media_type, headers=headers)
+            return Response(content=asset.body, media_type=asset.media_type, headers=headers)
         
-        document.getElementById('templateForm').onsubmit = async function(e) {{
-            e.preventDefault();
-            const name = document.getElementById('templateName').value;
-            const description = document.getElementById('templateDesc').value;
-            const content = document.getElementById('templateContent').value;
-            
-            try {{
-                const resp = await fetch('/templates?token=' + encodeURIComponent(token), {{
-                    method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify({{name, content, description}})
-                }});
-                if (resp.ok) {{
-                    alert('&#9989; 模板保存成功！');
-                    location.reload();
-                }} else {{
-                    const data = await resp.json();
-                    alert('&#10060; 保存失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
-                alert('&#10060; 保存失败：' + err.message);
-            }}
-        }};
+        # ============ HTML Pages ============
         
-        async function deleteTemplate(name) {{
-            if (!confirm('确定要删除模板 "' + name + '" 吗？')) return;
-            try {{
-                const resp = await fetch('/templates/' + encodeURIComponent(name) + '?token=' + encodeURIComponent(token), {{
-                    method: 'DELETE'
-                }});
-                if (resp.ok) {{
-                    location.reload();
-                }} else {{
-                    const data = await resp.json();
-                    alert('&#10060; 删除失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
-                alert('&#10060; 删除失败：' + err.message);
-            }}
-        }}
-    </script>
-</body>
-</html>
-"""
-            return HTMLResponse(content=html)
+        from ..core.prompts import DOCUMENT_TEMPLATE
         
-        @app.get("/status-mapping-page", response_class=HTMLResponse)
-        async def status_mapping_page(request: Request, _=Depends(verify_token)):
-            """Status subcategory mapping management page"""
-            mappings = await self.db.get_status_mappings()
-            
-            # Default status categories
-            status_options = [
-                ('burn', '燃烧 (Burn)'),
-                ('bleed', '流血 (Bleed)'),
-                ('tremor', '震颤 (Tremor)'),
-                ('rupture', '破裂 (Rupture)'),
-                ('sinking', '沉沦 (Sinking)'),
-                ('poise', '蓄力 (Poise)'),
-                ('charge', '充能 (Charge)'),
-                ('other', '其他'),
-            ]
+        # Everything around a page's content only depends on the token, so
+        # it is rendered and encoded once per server start
+        # JSON-encoded with '<' escaped so the token can't close the <script>
+        token_script = (
+            "\n        const token = " + json.dumps(self.token).replace('<', '\\u003c') + ";\n"
+        )
+        default_template_script = (
+            "        const defaultTemplate = " + json.dumps(DOCUMENT_TEMPLATE) + ";\n"
+        )
+        page_shells = {
+            'status': _render_page_shell(
+                self.token, 'status', '边狱巴士攻略管理', '📚 边狱巴士攻略管理系统',
+                page_css=_INDEX_PAGE_CSS
+            ),
+            'docs': _render_page_shell(
+                self.token, 'docs', '文档管理 - 边狱巴士攻略', '&#128196; 文档管理',
+                page_css=_DOCS_PAGE_CSS, script=token_script, script_asset='docs.js'
+            ),
+            'chunks': _render_page_shell(
+                self.token, 'chunks', '分块浏览 - 边狱巴士攻略', '&#128230; 分块浏览',
+                page_css=_CHUNKS_PAGE_CSS
+            ),
+            'search': _render_page_shell(
+                self.token, 'search', '检索调试 - 边狱巴士攻略', '&#128269; 检索调试',
+                page_css=_SEARCH_PAGE_CSS, script=token_script + _SEARCH_PAGE_JS
+            ),
+            'aliases': _render_page_shell(
+                self.token, 'aliases', '别名词典 - 边狱巴士攻略', '&#128221; 别名词典',
+                page_css=_ALIASES_PAGE_CSS, script=token_script, script_asset='aliases.js'
+            ),
+            'model': _render_page_shell(
+                self.token, 'model', '模型设置 - 边狱巴士攻略', '&#9881;&#65039; 模型设置',
+                page_css=_MODEL_PAGE_CSS
+            ),
+            'template': _render_page_shell(
+                self.token, 'template', '文档模版 - 边狱巴士攻略', '&#128203; 文档模版（中文版）',
+                page_css=_TEMPLATE_PAGE_CSS, script=token_script + default_template_script, script_asset='template.js'
+            ),
+            'mapping': _render_page_shell(
+                self.token, 'mapping', '状态映射 - 边狱巴士攻略', '&#127991;&#65039; 状态/子类映射',
+                page_css=_MAPPING_PAGE_CSS, script=token_script, script_asset='mapping.js'
+            ),
+        }
+        
+        # The search page has no dynamic content at all: render it once and
+        # tag it with a content hash
+        head, foot = page_shells['search']
+        search_page_html = head + _SEARCH_PAGE_HTML.encode('utf-8') + foot
+        search_page_etag = '"' + hashlib.md5(search_page_html).hexdigest() + '"'
+        search_page_headers = _page_cache_headers(search_page_etag)
+        
+        head, foot = page_shells['aliases']
+        aliases_page_html = head + (_ALIASES_PAGE_HTML + _ALIASES_LIST_HTML).encode('utf-8') + foot
+        aliases_page_etag = '"' + hashlib.md5(aliases_page_html).hexdigest() + '"'
+        aliases_page_headers = _page_cache_headers(aliases_page_etag)
+        
+        # The model page only reflects the config this server was started
+        # with, and the template/mapping pages only vary in their table
+        head, foot = page_shells['model']
+        model_page_html = head + _render_model_page(self.config).encode('utf-8') + foot
+        model_page_etag = '"' + hashlib.md5(model_page_html).hexdigest() + '"'
+        model_page_headers = _page_cache_headers(model_page_etag)
+        template_page_top = page_shells['template'][0] + (
+            _TEMPLATE_PAGE_HTML % _escape(DOCUMENT_TEMPLATE, quote=False)
+        ).encode('utf-8')
+        mapping_page_top = page_shells['mapping'][0] + _MAPPING_PAGE_HTML.encode('utf-8')
+        
+        status_runtime = (_INDEX_RUNTIME_TPL % (_escape(self.host), self.port)).encode('utf-8')
+        status_config = (_INDEX_CONFIG_TPL % (
+            self.config.get('top_k', 6),
+            self.config.get('chunk_size', 800),
+            self.config.get('overlap', 120),
+            self.config.get('group_boost', 1.2)
+        )).encode('utf-8')
+        
+        @router.get("/", response_class=HTMLResponse)
+        async def index_page(request: Request):
+            """Main status page"""
+            # Taken before querying: if a write lands meanwhile, the next
+            # request sees a different ETag and renders again
+            etag = self._page_etag()
+            if request.headers.get('if-none-match') == etag:
+                return Response(status_code=304, headers=_page_cache_headers(etag))
+            stats, group_ids = await self._get_status_snapshot()
             
-            status_options_html = ''.join(
-                f'<option value="{val}">{label}</option>' 
-                for val, label in status_options
+            head, foot = page_shells['status']
+            stats_html = _INDEX_STATS_TPL % (
+                stats['global']['doc_count'],
+                stats['global']['chunk_count'],
+                len(group_ids)
             )
+            return HTMLResponse(content=b''.join([
+                head, status_runtime, stats_html, status_config,
+                _INDEX_GROUPS_HEAD, _render_group_tags(group_ids).encode('utf-8'),
+                _INDEX_GROUPS_END, foot
+            ]), headers=_page_cache_headers(etag))
+        
+        @router.get("/docs-page", response_class=HTMLResponse)
+        async def docs_page(request: Request):
+            """Document management page"""
+            etag = self._page_etag()
+            if request.headers.get('if-none-match') == etag:
+                return Response(status_code=304, headers=_page_cache_headers(etag))
+            async def render():
+                global_docs, group_docs = await asyncio.gather(
+                    self.db.get_documents(scope='global'),
+                    self.db.get_documents(scope='group')
+                )
+                global_rows, group_rows = await asyncio.gather(
+                    _render_rows_async(_render_global_doc_rows, global_docs),
+                    _render_rows_async(_render_group_doc_rows, group_docs)
+                )
+                return (_DOCS_LIST_TPL % (
+                    len(global_docs), global_rows, len(group_docs), group_rows
+                )).encode('utf-8')
             
-            html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <title>状态映射 - 边狱巴士攻略</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-            min-height: 100vh;
-            color: #e0e0e0;
-            line-height: 1.6;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        .header {{
-            background: linear-gradient(90deg, #e94560 0%, #ff6b6b 100%);
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(233, 69, 96, 0.3);
-        }}
-        .header h1 {{ color: #fff; font-size: 28px; font-weight: 700; }}
-        nav {{
-            background: rgba(255, 255, 255, 0.05);
-            backdrop-filter: blur(10px);
-            padding: 15px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        nav a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.1);
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }}
-        nav a:hover, nav a.active {{
-            background: linear-gradient(90deg, #e94560, #ff6b6b);
-            color: #fff;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 15px rgba(233, 69, 96, 0.4);
-        }}
-        .card {{
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(10px);
-            padding: 25px;
-            margin: 15px 0;
-            border-radius: 16px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.2);
-        }}
-        .card h2 {{
-            color: #ff6b6b;
-            font-size: 20px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid rgba(233, 69, 96, 0.3);
-        }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-        th, td {{ padding: 15px; text-align: left; border-bottom: 1px solid rgba(255, 255, 255, 0.1); }}
-        th {{ 
-            background: rgba(233, 69, 96, 0.2); 
-            color: #ff6b6b;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 12px;
-            letter-spacing: 1px;
-        }}
-        tr:hover {{ background: rgba(255, 255, 255, 0.05); }}
-        .btn {{
-            padding: 10px 20px;
-            cursor: pointer;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            font-size: 14px;
-        }}
-        .btn-danger {{
-            background: linear-gradient(90deg, #dc3545, #c82333);
-            color: white;
-        }}
-        .btn-primary {{
-            background: linear-gradient(90deg, #4ecca3, #38b984);
-            color: white;
-        }}
-        .btn:hover {{ transform: translateY(-2px); }}
-        .form-group {{ margin-bottom: 20px; }}
-        .form-group label {{
-            display: block;
-            margin-bottom: 8px;
-            color: #a0a0a0;
-            font-weight: 500;
-        }}
-        input[type="text"], select {{
-            width: 100%;
-            max-width: 400px;
-            padding: 12px 16px;
-            border: 2px solid rgba(255, 255, 255, 0.1);
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.05);
-            color: #e0e0e0;
-            font-size: 14px;
-            transition: border-color 0.3s ease;
-        }}
-        input:focus, select:focus {{ outline: none; border-color: #4ecca3; }}
-        select option {{ background: #1a1a2e; color: #e0e0e0; }}
-        .empty-row {{ color: #666; font-style: italic; text-align: center; }}
-        .info-box {{
-            background: rgba(78, 204, 163, 0.1);
-            border-left: 4px solid #4ecca3;
-            padding: 15px 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            font-size: 14px;
-            color: #a0a0a0;
-        }}
-        .info-box strong {{ color: #4ecca3; }}
-        .example-box {{
-            background: rgba(255, 193, 7, 0.1);
-            border-left: 4px solid #ffc107;
-            padding: 15px 20px;
-            border-radius: 8px;
-            margin: 15px 0;
-            font-size: 14px;
-            color: #a0a0a0;
-        }}
-        .example-box strong {{ color: #ffc107; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>&#127991;&#65039; 状态/子类映射</h1>
-        </div>
+            head, foot = page_shells['docs']
+            tables = await self._cached_table('docs', render)
+            return HTMLResponse(
+                content=b''.join([head, _DOCS_UPLOAD_HTML, tables, foot]),
+                headers=_page_cache_headers(etag)
+            )
         
-        {_render_nav(self.token, 'mapping')}
+        @router.get("/chunks-page", response_class=HTMLResponse)
+        async def chunks_page(
+            request: Request,
+            group_id: Optional[str] = None,
+            doc_id: Optional[int] = None,
+            offset: int = 0
+        ):
+            """Chunk browsing page"""
+            offset = max(offset, 0)
+            if group_id and not self.db.has_group_data(group_id):
+                chunks, total = [], 0
+            else:
+                chunks, total = await asyncio.gather(
+                    self.db.get_chunks(
+                        group_id=group_id, doc_id=doc_id, limit=_CHUNKS_PAGE_LIMIT, offset=offset,
+                        content_preview_len=_CHUNK_PREVIEW_CHARS
+                    ),
+                    self.db.get_chunk_count(group_id=group_id, doc_id=doc_id)
+                )
+            
+            head, foot = page_shells['chunks']
+            filters = _CHUNKS_FILTERS_TPL % (
+                _escape(self.token), _escape(group_id or ''), doc_id or '',
+                offset + 1 if chunks else 0, offset + len(chunks) if chunks else 0, total
+            )
+            pager = _render_chunks_pager(self.token, group_id, doc_id, offset, total)
+            
+            # Stream chunk by chunk so the page is never held in memory twice
+            # (as one big str and again as its encoded bytes)
+            async def body():
+                yield head
+                yield filters.encode('utf-8')
+                if not chunks:
+                    yield _EMPTY_CHUNKS_HTML.encode('utf-8')
+                for chunk in chunks:
+                    yield _render_chunk(chunk).encode('utf-8')
+                yield pager.encode('utf-8') + _CHUNKS_LIST_END + foot
+            
+            return StreamingResponse(
+                body(),
+                media_type="text/html; charset=utf-8",
+                headers={'Cache-Control': _PAGE_CACHE_CONTROL}
+            )
         
-        <div class="card">
-            <h2>&#9881;&#65039; 功能说明</h2>
-            <div class="info-box">
-                <strong>&#128161; 什么是状态映射？</strong><br>
-                状态映射允许你为游戏中的状态效果定义自定义子类别和显示名称。
-                这在检索时可以帮助更精确地匹配用户的查询意图。
-            </div>
-            <div class="example-box">
-                <strong>&#128221; 使用示例：</strong><br>
-                • 状态：<strong>破裂 (rupture)</strong> → 子类别：<strong>被动破裂</strong> → 显示名称：<strong>非破裂但有破裂效果</strong><br>
-                • 状态：<strong>燃烧 (burn)</strong> → 子类别：<strong>燃烧叠层</strong> → 显示名称：<strong>高叠层燃烧流派</strong><br>
-                • 状态：<strong>震颤 (tremor)</strong> → 子类别：<strong>震颤爆发</strong> → 显示名称：<strong>震颤计数触发伤害</strong>
-            </div>
-        </div>
+        @router.get("/search-page", response_class=HTMLResponse)
+        async def search_page(request: Request):
+            """Search debugging page"""
+            if request.headers.get('if-none-match') == search_page_etag:
+                return Response(status_code=304, headers=search_page_headers)
+            return HTMLResponse(content=search_page_html, headers=search_page_headers)
         
-        <div class="card">
-            <h2>&#10133; 添加状态映射</h2>
-            <form id="mappingForm">
-                <div class="form-group">
-                    <label>主状态类别</label>
-                    <select id="statusName" required>
-                        {status_options_html}
-                    </select>
-                </div>
-                <div class="form-group">
-                    <label>子类别名称</label>
-                    <input type="text" id="subcategory" placeholder="例如：被动破裂、高叠层燃烧" required>
-                </div>
-                <div class="form-group">
-                    <label>显示名称</label>
-                    <input type="text" id="displayName" placeholder="例如：非破裂但有破裂效果" required>
-                </div>
-                <div class="form-group">
-                    <label>描述（可选）</label>
-                    <input type="text" id="mappingDesc" placeholder="简短描述这个子类别的特点">
-                </div>
-                <button type="submit" class="btn btn-primary">&#10133; 添加映射</button>
-            </form>
-        </div>
+        @router.get("/aliases-page", response_class=HTMLResponse)
+        async def aliases_page(request: Request):
+            """Alias management page"""
+            if request.headers.get('if-none-match') == aliases_page_etag:
+                return Response(status_code=304, headers=aliases_page_headers)
+            return HTMLResponse(content=aliases_page_html, headers=aliases_page_headers)
         
-        <div class="card">
-            <h2>&#128203; 映射列表（共 {len(mappings)} 条）</h2>
-            <table>
-                <tr><th>主状态</th><th>子类别</th><th>显示名称</th><th>描述</th><th>操作</th></tr>
-                {_render_status_mapping_rows(mappings)}
-            </table>
-        </div>
-    </div>
-    
-    <script>
-        const token = '{self.token}';
+        @router.get("/model-settings-page", response_class=HTMLResponse)
+        async def model_settings_page(request: Request):
+            """Model settings page with embedding and reranking status"""
+            if request.headers.get('if-none-match') == model_page_etag:
+                return Response(status_code=304, headers=model_page_headers)
+            return HTMLResponse(content=model_page_html, headers=model_page_headers)
         
-        document.getElementById('mappingForm').onsubmit = async function(e) {{
-            e.preventDefault();
-            const status_name = document.getElementById('statusName').value;
-            const subcategory = document.getElementById('subcategory').value;
-            const display_name = document.getElementById('displayName').value;
-            const description = document.getElementById('mappingDesc').value;
-            
-            try {{
-                const resp = await fetch('/status-mappings?token=' + token, {{
-                    method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify({{status_name, subcategory, display_name, description}})
-                }});
-                if (resp.ok) {{
-                    alert('&#9989; 映射添加成功！');
-                    location.reload();
-                }} else {{
-                    const data = await resp.json();
-                    alert('&#10060; 添加失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
-                alert('&#10060; 添加失败：' + err.message);
-            }}
-        }};
+        @router.get("/template-page", response_class=HTMLResponse)
+        async def template_page(request: Request):
+            """Document template management page"""
+            async def render():
+                templates = await self.db.get_templates()
+                return (_TEMPLATE_LIST_TPL % (
+                    len(templates), _render_template_rows(templates)
+                )).encode('utf-8')
+            table = await self._cached_table('template', render)
+            return HTMLResponse(
+                content=b''.join([template_page_top, table, page_shells['template'][1]]),
+                headers={'Cache-Control': _PAGE_CACHE_CONTROL}
+            )
         
-        async function deleteMapping(id) {{
-            if (!confirm('确定要删除这个映射吗？')) return;
-            try {{
-                const resp = await fetch('/status-mappings/' + id + '?token=' + token, {{
-                    method: 'DELETE'
-                }});
-                if (resp.ok) {{
-                    location.reload();
-                }} else {{
-                    const data = await resp.json();
-                    alert('&#10060; 删除失败：' + (data.detail || '未知错误'));
-                }}
-            }} catch (err) {{
-                alert('&#10060; 删除失败：' + err.message);
-            }}
-        }}
-    </script>
-</body>
-</html>
-"""
-            return HTMLResponse(content=html)
+        @router.get("/status-mapping-page", response_class=HTMLResponse)
+        async def status_mapping_page(request: Request):
+            """Status subcategory mapping management page"""
+            async def render():
+                mappings = await self.db.get_status_mappings()
+                return (_MAPPING_LIST_TPL % (
+                    len(mappings), _render_status_mapping_rows(mappings)
+                )).encode('utf-8')
+            table = await self._cached_table('mapping', render)
+            return HTMLResponse(
+                content=b''.join([mapping_page_top, table, page_shells['mapping'][1]]),
+                headers={'Cache-Control': _PAGE_CACHE_CONTROL}
+            )
         
         # ============ REST API ============
         
-        @app.get("/docs")
+        @router.get("/docs")
         async def list_docs(
             scope: Optional[str] = None,
-            group_id: Optional[str] = None,
-            _=Depends(verify_token)
+            group_id: Optional[str] = None
         ):
             """List documents"""
             docs = await self.db.get_documents(scope=scope, group_id=group_id)
             return {"documents": docs}
         
-        @app.post("/docs/upload")
+        @router.post("/docs/upload")
         async def upload_doc(
             file: UploadFile = File(...),
             scope: str = Form("global"),
-            group_id: Optional[str] = Form(None),
-            _=Depends(verify_token)
+            group_id: Optional[str] = Form(None)
         ):
             """Upload a document"""
-            # Read file content
-            content = await file.read()
-            try:
-                text = content.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    text = content.decode('gbk')
-                except UnicodeDecodeError:
-                    raise HTTPException(status_code=400, detail="无法解码文件，请使用UTF-8编码")
+            # Decode straight from the spooled upload in a worker thread, so a
+            # large file neither stalls the event loop nor sits in memory twice
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(None, _read_upload_text, file.file)
+            if text is None:
+                raise HTTPException(status_code=400, detail="无法解码文件，请使用UTF-8编码")
             
             if not text.strip():
                 raise HTTPException(status_code=400, detail="文件内容为空")
@@ -2325,40 +2455,34 @@ class WebUIServer:
             # Get filename
             filename = file.filename or f"doc_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
-            # Process document
-            doc_id = await self.db.add_document(
-                name=filename,
-                raw_text=text,
-                scope=scope,
-                group_id=group_id if scope == 'group' else None
+            # Chunking and tagging are pure CPU work; keep them off the loop
+            chunks = await loop.run_in_executor(
+                None, _chunk_and_tag, self.chunker, self.tagger, text, filename
             )
             
-            # Chunk and tag
-            chunks = self.chunker.process_document(text, filename)
-            chunks = self.tagger.process_chunks(chunks)
-            
-            # Save chunks
-            await self.db.add_chunks(
-                doc_id=doc_id,
+            # Document and chunks land in a single transaction
+            doc_id = await self.db.import_document(
+                name=filename,
+                raw_text=text,
                 chunks=chunks,
                 scope=scope,
                 group_id=group_id if scope == 'group' else None
             )
             
             # Trigger index update
-            if self.on_index_update:
-                await self.on_index_update()
+            await self._on_data_changed()
             
             return {
                 "success": True,
                 "doc_id": doc_id,
                 "name": filename,
                 "char_count": len(text),
-                "chunk_count": len(chunks)
+                "chunk_count": len(chunks),
+                "index_updating": self.index_updating
             }
         
-        @app.delete("/docs/{doc_id}")
-        async def delete_doc(doc_id: int, _=Depends(verify_token)):
+        @router.delete("/docs/{doc_id}")
+        async def delete_doc(doc_id: int):
             """Delete a document"""
             doc = await self.db.get_document_by_id(doc_id)
             if not doc:
@@ -2366,54 +2490,95 @@ class WebUIServer:
             
             await self.db.delete_document(doc_id)
             
-            if self.on_index_update:
-                await self.on_index_update()
+            await self._on_data_changed()
             
             return {"success": True}
         
-        @app.delete("/docs/clear")
+        @router.post("/docs/batch_delete")
+        async def batch_delete_docs(request: BatchDeleteRequest):
+            """Delete several documents, rebuilding the index once"""
+            deleted = await self.db.delete_documents(request.doc_ids)
+            if deleted:
+                await self._on_data_changed()
+            
+            return {"success": True, "deleted": deleted}
+        
+        @router.delete("/docs/clear")
         async def clear_docs(
             scope: Optional[str] = None,
-            group_id: Optional[str] = None,
-            _=Depends(verify_token)
+            group_id: Optional[str] = None
         ):
             """Clear documents"""
+            # Nothing to delete (or reindex) for a group without data
+            if group_id and not self.db.has_group_data(group_id):
+                return {"success": True}
+            
             await self.db.clear_documents(scope=scope, group_id=group_id)
             
-            if self.on_index_update:
-                await self.on_index_update()
+            await self._on_data_changed()
             
             return {"success": True}
         
-        @app.get("/chunks")
+        @router.get("/chunks")
         async def list_chunks(
+            request: Request,
             scope: Optional[str] = None,
             group_id: Optional[str] = None,
             doc_id: Optional[int] = None,
-            _=Depends(verify_token)
+            limit: Optional[int] = None,
+            offset: int = 0
         ):
-            """List chunks"""
-            chunks = await self.db.get_chunks(scope=scope, group_id=group_id, doc_id=doc_id)
-            return {"chunks": chunks}
-        
-        @app.post("/search")
-        async def search(request: SearchRequest, _=Depends(verify_token)):
-            """Search chunks"""
-            result = self.searcher.search_with_debug(
-                query=request.query,
-                top_k=request.top_k,
-                group_id=request.group_id
+            """List chunks, optionally one page at a time"""
+            etag = self._page_etag()
+            if request.headers.get('if-none-match') == etag:
+                return Response(status_code=304, headers=_api_cache_headers(etag))
+            if group_id and not self.db.has_group_data(group_id):
+                chunks = []
+            else:
+                chunks = await self.db.get_chunks(
+                    scope=scope, group_id=group_id, doc_id=doc_id,
+                    limit=None if limit is None else max(limit, 0), offset=max(offset, 0)
+                )
+            return DefaultResponse({"chunks": chunks}, headers=_api_cache_headers(etag))
+        
+        # Polled replies are served as pre-serialized bytes; verify_token's
+        # header only reaches plain-data replies, so no-store is set here
+        api_cache_headers = {'Cache-Control': 'no-store'}
+        
+        @router.get("/chunks/stream")
+        async def stream_chunks(
+            scope: Optional[str] = None,
+            group_id: Optional[str] = None,
+            doc_id: Optional[int] = None
+        ):
+            """Stream chunks as NDJSON, one object per line"""
+            async def lines():
+                async for chunk in self.db.iter_chunks(scope=scope, group_id=group_id, doc_id=doc_id):
+                    yield _dump_json(chunk) + b'\n'
+            return StreamingResponse(
+                lines(), media_type='application/x-ndjson',
+                headers={'Cache-Control': 'no-store'}
             )
-            return result
         
-        @app.get("/aliases")
-        async def list_aliases(_=Depends(verify_token)):
-            """List all aliases"""
-            aliases = await self.db.get_aliases()
-            return {"aliases": aliases}
+        @router.post("/search")
+        async def search(request: SearchRequest, debug: bool = False):
+            """Search chunks; ?debug=1 adds query analysis and index statistics"""
+            body = await self._cached_search(request.query, request.top_k, request.group_id, debug)
+            return Response(content=body, media_type='application/json', headers=api_cache_headers)
         
-        @app.post("/aliases")
-        async def add_alias(request: AliasRequest, _=Depends(verify_token)):
+        @router.get("/aliases")
+        async def list_aliases(request: Request):
+            """List all aliases"""
+            etag = self._page_etag()
+            if request.headers.get('if-none-match') == etag:
+                return Response(status_code=304, headers=_api_cache_headers(etag))
+            async def load():
+                return {"aliases": await self.db.get_aliases()}
+            body = await self._cached_json(('aliases',), load)
+            return Response(content=body, media_type='application/json', headers=_api_cache_headers(etag))
+        
+        @router.post("/aliases")
+        async def add_alias(request: AliasRequest):
             """Add or update an alias"""
             await self.db.add_alias(
                 alias=request.alias,
@@ -2421,55 +2586,65 @@ class WebUIServer:
                 alias_type=request.type
             )
             
-            # Update searcher
-            alias_map = await self.db.get_alias_map()
-            self.searcher.update_aliases(alias_map)
+            # Keyed the same way the database stores it (lowercased)
+            self.searcher.add_alias(request.alias, request.canonical)
+            self.invalidate_search_cache()
             
             return {"success": True}
         
-        @app.delete("/aliases/{alias}")
-        async def delete_alias(alias: str, _=Depends(verify_token)):
+        @router.delete("/aliases/{alias}")
+        async def delete_alias(alias: str):
             """Delete an alias"""
             success = await self.db.delete_alias(alias)
             if not success:
                 raise HTTPException(status_code=404, detail="别名不存在")
             
-            # Update searcher
-            alias_map = await self.db.get_alias_map()
-            self.searcher.update_aliases(alias_map)
+            self.searcher.remove_alias(alias)
+            self.invalidate_search_cache()
             
             return {"success": True}
         
-        @app.get("/stats")
-        async def get_stats(group_id: Optional[str] = None, _=Depends(verify_token)):
+        @router.get("/stats")
+        async def get_stats(request: Request, group_id: Optional[str] = None):
             """Get knowledge base statistics"""
-            stats = await self.db.get_stats(group_id)
-            return stats
+            index_updating = self.index_updating
+            etag = self._page_etag(int(index_updating))
+            if request.headers.get('if-none-match') == etag:
+                return Response(status_code=304, headers=_api_cache_headers(etag))
+            # A group without data has all-zero group counts; skip its query
+            if group_id and not self.db.has_group_data(group_id):
+                group_id = None
+            async def load():
+                stats = await self.db.get_stats(group_id)
+                stats['index_updating'] = index_updating
+                return stats
+            body = await self._cached_json(('stats', group_id, index_updating), load)
+            return Response(content=body, media_type='application/json', headers=_api_cache_headers(etag))
         
         # ============ Template API ============
         
-        @app.get("/templates")
-        async def list_templates(_=Depends(verify_token)):
+        @router.get("/templates")
+        async def list_templates():
             """List all custom templates"""
             templates = await self.db.get_templates()
             return {"templates": templates}
         
-        @app.get("/templates/{name}")
-        async def get_template(name: str, _=Depends(verify_token)):
+        @router.get("/templates/{name}")
+        async def get_template(name: str):
             """Get a template by name"""
             template = await self.db.get_template_by_name(name)
             if not template:
                 raise HTTPException(status_code=404, detail="模板不存在")
             return {"template": template}
         
-        class TemplateRequest(BaseModel):
+        class TemplateRequest(RequestModel):
             name: str
             content: str
             description: str = ''
             is_default: bool = False
         
-        @app.post("/templates")
-        async def save_template(request: TemplateRequest, _=Depends(verify_token)):
+        @router.post("/templates")
+        async def save_template(request: TemplateRequest):
             """Save or update a custom template"""
             template_id = await self.db.save_template(
                 name=request.name,
@@ -2479,8 +2654,8 @@ class WebUIServer:
             )
             return {"success": True, "id": template_id}
         
-        @app.delete("/templates/{name}")
-        async def delete_template(name: str, _=Depends(verify_token)):
+        @router.delete("/templates/{name}")
+        async def delete_template(name: str):
             """Delete a custom template"""
             success = await self.db.delete_template(name)
             if not success:
@@ -2489,20 +2664,20 @@ class WebUIServer:
         
         # ============ Status Mapping API ============
         
-        @app.get("/status-mappings")
-        async def list_status_mappings(status_name: Optional[str] = None, _=Depends(verify_token)):
+        @router.get("/status-mappings")
+        async def list_status_mappings(status_name: Optional[str] = None):
             """List status mappings"""
             mappings = await self.db.get_status_mappings(status_name)
             return {"mappings": mappings}
         
-        class StatusMappingRequest(BaseModel):
+        class StatusMappingRequest(RequestModel):
             status_name: str
             subcategory: str
             display_name: str
             description: str = ''
         
-        @app.post("/status-mappings")
-        async def add_status_mapping(request: StatusMappingRequest, _=Depends(verify_token)):
+        @router.post("/status-mappings")
+        async def add_status_mapping(request: StatusMappingRequest):
             """Add or update a status mapping"""
             mapping_id = await self.db.add_status_mapping(
                 status_name=request.status_name,
@@ -2512,36 +2687,76 @@ class WebUIServer:
             )
             return {"success": True, "id": mapping_id}
         
-        @app.delete("/status-mappings/{mapping_id}")
-        async def delete_status_mapping(mapping_id: int, _=Depends(verify_token)):
+        @router.delete("/status-mappings/{mapping_id}")
+        async def delete_status_mapping(mapping_id: int):
             """Delete a status mapping"""
             success = await self.db.delete_status_mapping(mapping_id)
             if not success:
                 raise HTTPException(status_code=404, detail="映射不存在")
             return {"success": True}
         
+        app.include_router(router)
         self.app = app
         
-        # Start server in background
-        config = uvicorn.Config(
-            app,
-            host=self.host,
-            port=self.port,
-            log_level="warning"
-        )
-        self.server = uvicorn.Server(config)
-        self._server_task = asyncio.create_task(self.server.serve())
+        # Start server in background. The server runs on AstrBot's existing
+        # event loop (uvloop applies only if the host already installed it;
+        # installing it here would swap the loop policy under the host), so
+        # only the HTTP parser is selected here. The app registers no
+        # startup/shutdown handlers, so the lifespan protocol is skipped,
+        # and no Server header is written on every reply.
+        # The socket is bound here and handed to uvicorn, so nothing can grab
+        # the port between the availability probe and the server starting
+        loop = asyncio.get_running_loop()
+        try:
+            listen_sock = await loop.run_in_executor(
+                None, _bind_listen_socket, self.host, self.port, _SERVER_BACKLOG
+            )
+        except (OSError, OverflowError) as e:
+            if getattr(e, 'errno', None) == errno.EADDRINUSE:
+                raise RuntimeError(
+                    f"端口 {self.port} 已被占用。请在配置中更改 webui_port，"
+                    f"或检查是否有其他服务正在使用该端口。"
+                )
+            raise RuntimeError(f"WebUI 无法绑定端口 {self.port}: {e}")
         
-        # Wait a moment and check if server started successfully
-        # The port check above should catch most issues, but we also
-        # wait a bit to see if any startup errors occur
-        await asyncio.sleep(_SERVER_STARTUP_CHECK_DELAY)
+        try:
+            config = uvicorn.Config(
+                app,
+                host=self.host,
+                port=self.port,
+                http=_uvicorn_http_impl(),
+                backlog=_SERVER_BACKLOG,
+                timeout_keep_alive=_SERVER_KEEP_ALIVE_TIMEOUT,
+                limit_concurrency=_SERVER_LIMIT_CONCURRENCY,
+                lifespan="off",
+                server_header=False,
+                # The WebUI is reached directly, never through a trusted proxy
+                proxy_headers=False,
+                access_log=self.debug,
+                log_level="info" if self.debug else "warning"
+            )
+            self.server = uvicorn.Server(config)
+            self._server_task = asyncio.create_task(
+                self.server.serve(sockets=[listen_sock]), name="limbus-webui-serve"
+            )
+        except BaseException:
+            listen_sock.close()
+            raise
+        
+        # Binding above catches port conflicts; wait until uvicorn reports it
+        # is serving, or its task ends early, to catch other startup errors
+        deadline = loop.time() + _SERVER_STARTUP_TIMEOUT
+        while (not getattr(self.server, 'started', False)
+               and not self._server_task.done()
+               and loop.time() < deadline):
+            await asyncio.sleep(_SERVER_STARTUP_POLL_INTERVAL)
         
         # Check if the server task has already failed
         if self._server_task.done():
             try:
                 self._server_task.result()
             except Exception as e:
+                listen_sock.close()
                 raise RuntimeError(f"WebUI 服务器启动失败: {e}")
         
         # Check if server actually started (uvicorn sets started=True after binding)
@@ -2551,12 +2766,18 @@ class WebUIServer:
                 await self._server_task
             except asyncio.CancelledError:
                 pass
+            listen_sock.close()
             raise RuntimeError(
                 f"WebUI 服务器启动失败。请检查端口 {self.port} 是否可用。"
             )
+        
+        # Have the first status page view served from memory
+        await self._warm_status_snapshot()
     
     async def stop(self):
         """Stop the WebUI server"""
+        if self.index_updating:
+            self._index_update_task.cancel()
         if self.server:
             self.server.should_exit = True
             if self._server_task: